@@ -0,0 +1,76 @@
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import quote
+
+import requests
+import xbmc
+
+from classes.StremioStream import StremioStream
+from modules.utils import get_setting, log
+
+PEER_SEARCH_MIN = 40
+PEER_SEARCH_MAX = 200
+
+
+@dataclass
+class StreamingServerAPI:
+    session: requests.Session = field(init=False, default_factory=requests.Session)
+
+    @property
+    def base_url(self) -> str:
+        return (get_setting("sources.streaming_server") or "").rstrip("/")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(get_setting("sources.use_streaming_server") and self.base_url)
+
+    def _request(self, method: str, path: str, post_data=None, default_return=None):
+        if default_return is None:
+            default_return = {}
+        response = None
+        url = f"{self.base_url}/{path}"
+        log(url, xbmc.LOGINFO)
+        try:
+            response = self.session.request(method, url, json=post_data, timeout=20)
+            return response.json()
+        except Exception as e:
+            log(str(e), xbmc.LOGERROR)
+            if response:
+                log(str(response), xbmc.LOGERROR)
+            return default_return
+
+    def create(self, stream: StremioStream) -> int | None:
+        info_hash = stream.infoHash.lower()
+        response = self._request(
+            "POST",
+            f"{info_hash}/create",
+            {
+                "torrent": {"infoHash": info_hash},
+                "peerSearch": {
+                    "sources": stream.sources or [f"dht:{info_hash}"],
+                    "min": PEER_SEARCH_MIN,
+                    "max": PEER_SEARCH_MAX,
+                },
+                "guessFileIdx": {},
+            },
+        )
+        if not response:
+            log(f"Streaming server could not create {info_hash}", xbmc.LOGERROR)
+            return None
+        if stream.fileIdx is not None:
+            return stream.fileIdx
+        if (guessed := response.get("guessedFileIdx")) is not None:
+            return guessed
+        files = response.get("files") or []
+        if not files:
+            return None
+        return max(range(len(files)), key=lambda i: files[i].get("length", 0))
+
+    def stream_url(self, info_hash: str, file_idx: int) -> str:
+        return f"{self.base_url}/{quote(info_hash.lower())}/{file_idx}"
+
+    def stats(self, info_hash: str, file_idx: int) -> dict[str, Any]:
+        return self._request("GET", f"{info_hash.lower()}/{file_idx}/stats.json")
+
+
+streaming_server = StreamingServerAPI()
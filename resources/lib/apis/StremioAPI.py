@@ -1,11 +1,14 @@
 import codecs
 import datetime
 import json
+import os
 import requests.adapters
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from functools import reduce
 from itertools import chain
 from typing import Any, Callable
+from urllib.parse import quote, urlencode
 
 import xbmc
 from xbmcgui import Dialog
@@ -30,6 +33,10 @@ from modules.utils import (
     thread_function,
     classes_from_list,
 )
+from modules.versions import DataVersion, bump_version
+
+NOTIFICATION_IDS_MAX_LENGTH = 1500
+METADATA_BATCH_WORKERS = 6
 
 
 @dataclass
@@ -46,6 +53,7 @@ class StremioAPI:
     data_store_cache: str = field(
         init=False, default_factory=lambda: nas_addon.get_file_path("datastore.json")
     )
+    data_store_mtime: float | None = field(init=False, default=None)
 
     def __post_init__(self):
         self.token = get_setting("stremio.token")
@@ -166,8 +174,10 @@ class StremioAPI:
         set_setting("stremio.user", "")
         self.token = get_setting("stremio.token")
 
-        import os
+        from modules.sync import event_buffer, sync_queue
 
+        sync_queue.cache.clear()
+        event_buffer.cache.clear()
         os.remove(self.data_store_cache)
 
     def get_addons(self, refresh: bool = False) -> list[StremioAddon]:
@@ -178,27 +188,50 @@ class StremioAPI:
         ):
             self.addons_updated = datetime.datetime.now()
             response = self._post("addonCollectionGet", {"update": True})
+            previous = [a.transportUrl for a in self.addons]
             self.addons = classes_from_list(StremioAddon, response.get("addons", []))
+            if previous and previous != [a.transportUrl for a in self.addons]:
+                bump_version(DataVersion.ADDONS)
             self.catalogs = list(chain(*[a.manifest.catalogs for a in self.addons]))
         return self.addons
 
     def write_data_store(self):
-        with open(self.data_store_cache, "wb") as f:
+        temp_path = f"{self.data_store_cache}.{os.getpid()}"
+        with open(temp_path, "wb") as f:
             json.dump(
                 [i.as_dict() for i in self.data_store.values()],
                 codecs.getwriter("utf-8")(f),
                 ensure_ascii=False,
             )
+        os.replace(temp_path, self.data_store_cache)
+        self.data_store_mtime = os.path.getmtime(self.data_store_cache)
 
     def load_data_store(self):
         try:
+            mtime = os.path.getmtime(self.data_store_cache)
             with open(self.data_store_cache) as f:
-                return json.load(f)
+                data = json.load(f)
+            self.data_store_mtime = mtime
+            return data
         except Exception as e:
             log(str(e), xbmc.LOGERROR)
             return None
 
+    def _data_store_changed(self) -> bool:
+        try:
+            return os.path.getmtime(self.data_store_cache) != self.data_store_mtime
+        except OSError:
+            return False
+
+    def _reload_data_store(self):
+        if self._data_store_changed() and (cached_store := self.load_data_store()):
+            self._merge_data_store(
+                classes_from_list(StremioLibrary, cached_store), replace=True
+            )
+
     def get_data_store(self, refresh: bool = False) -> dict[str, StremioLibrary]:
+        if self.data_store and not refresh:
+            self._reload_data_store()
         if not self.data_store or refresh:
             cached_store = self.load_data_store()
             response = cached_store
@@ -209,6 +242,11 @@ class StremioAPI:
             self.data_store = {
                 i.id: i for i in classes_from_list(StremioLibrary, response)
             }
+
+            from modules.search_index import search_index
+
+            search_index.update_library(self.data_store.values())
+            bump_version(DataVersion.DATASTORE)
             if cached_store and not refresh:
                 self.update_data_store()
             self.write_data_store()
@@ -217,13 +255,18 @@ class StremioAPI:
     def update_data_store(self):
         data_store = self.data_store
         meta = self._post("datastoreMeta", {"collection": "libraryItem"})
+        from modules.sync import sync_queue
+
         outdated_ids = []
         for i in meta:
-            if i[0] not in data_store or data_store[
-                i[0]
-            ].mtime < datetime.datetime.fromtimestamp(
+            remote_mtime = datetime.datetime.fromtimestamp(
                 i[1] / 1000, datetime.timezone.utc
+            )
+            if (queued_mtime := sync_queue.get_mtime(i[0])) and (
+                queued_mtime >= remote_mtime
             ):
+                continue
+            if i[0] not in data_store or data_store[i[0]].mtime < remote_mtime:
                 outdated_ids.append(i[0])
 
         if not len(outdated_ids):
@@ -232,13 +275,43 @@ class StremioAPI:
         self.get_data_by_ids(outdated_ids)
         self.write_data_store()
 
+        from modules.continue_watching import continue_watching
+
+        continue_watching.update(
+            [self.data_store[i] for i in outdated_ids if i in self.data_store]
+        )
+
+    def _merge_data_store(self, items: list[StremioLibrary], replace=False):
+        from modules.search_index import search_index
+
+        dropped = []
+        if replace:
+            ids = {i.id for i in items}
+            dropped = [k for k in self.data_store if k not in ids]
+            for k in dropped:
+                del self.data_store[k]
+            search_index.drop_library(dropped)
+
+        changed = []
+        for i in items:
+            if i.id in self.data_store:
+                current = self.data_store[i.id]
+                if i.mtime and (current.mtime is None or i.mtime > current.mtime):
+                    current.update_from(i)
+                    changed.append(self.data_store[i.id])
+            else:
+                self.data_store[i.id] = i
+                changed.append(i)
+        search_index.update_library(changed)
+        if changed or dropped:
+            bump_version(DataVersion.DATASTORE)
+
     def get_data_by_ids(self, ids: list[str]):
         response = self._post(
             "datastoreGet",
             {"ids": ids, "collection": "libraryItem"},
         )
-        for i in classes_from_list(StremioLibrary, response):
-            self.data_store[i.id] = i
+        self._merge_data_store(classes_from_list(StremioLibrary, response))
 
     def get_data_by_meta(self, meta: StremioMeta) -> StremioLibrary | None:
         data_store = self.get_data_store()
@@ -248,11 +321,24 @@ class StremioAPI:
             else StremioLibrary(**{"_id": meta.id, **meta.as_dict()})
         )
 
+    def put_data(self, changes: list[dict]) -> bool:
+        post_data = {"collection": "libraryItem", "changes": changes}
+        return bool(self._post("datastorePut", post_data, False))
+
     def set_data(self, data: StremioLibrary):
+        from modules.search_index import search_index
+        from modules.sync import sync_queue
+
+        self._reload_data_store()
         self.data_store[data.id] = data
         self.write_data_store()
-        post_data = {"collection": "libraryItem", "changes": [data.as_dict()]}
-        self._post("datastorePut", post_data)
+        sync_queue.put(data)
+        search_index.update_library([data])
+        bump_version(DataVersion.DATASTORE)
+
+        from modules.continue_watching import continue_watching
+
+        continue_watching.update([data])
 
     def get_library_types(self) -> list[str]:
         types = []
@@ -263,25 +349,16 @@ class StremioAPI:
         types.insert(0, "all")
         return types
 
-    def get_library(self, type_filter: str | None = None) -> list[StremioMeta]:
-        responses = [
-            StremioMeta(**{"id": i.id, **i.as_dict()})
-            for i in sorted(
-                [v for k, v in self.get_data_store().items() if not v.removed],
-                key=lambda e: e.state.lastWatched,
-                reverse=True,
-            )
-            if type_filter is None or i.type == type_filter
-        ]
-        return responses
-
-    def get_metadata_by_libraries(
-        self, libraries: list[StremioLibrary]
-    ) -> list[StremioMeta]:
-        def _get_meta(item: StremioLibrary):
-            return self.get_metadata_by_id(item.id, item.type)
-
-        return [r for r in thread_function(_get_meta, libraries) if r]
+    def get_library_items(self, type_filter: str | None = None) -> list[StremioLibrary]:
+        return sorted(
+            [
+                v
+                for v in self.get_data_store().values()
+                if not v.removed and (type_filter is None or v.type == type_filter)
+            ],
+            key=lambda e: e.state.lastWatched,
+            reverse=True,
+        )
 
     def get_metadata_by_id(
         self, content_id: str, content_type: str, refresh=False
@@ -302,33 +379,90 @@ class StremioAPI:
             self.metadata[content_id] = StremioMeta(
                 **reduce(lambda a, b: {**b, **a}, results)
             )
+
+            from modules.search_index import search_index
+
+            search_index.add_metas([self.metadata[content_id]])
         return self.metadata[content_id]
 
+    def get_metadata_by_ids(
+        self, items: list[tuple[str, str]]
+    ) -> dict[str, StremioMeta]:
+        def _get_meta(item: tuple[str, str]) -> StremioMeta | None:
+            try:
+                return self.get_metadata_by_id(*item)
+            except Exception as e:
+                log(f"{item[0]}: {e}", xbmc.LOGERROR)
+                return None
+
+        missing = list(dict.fromkeys(i for i in items if i[0] not in self.metadata))
+        if missing:
+            with ThreadPoolExecutor(METADATA_BATCH_WORKERS) as executor:
+                list(executor.map(_get_meta, missing))
+        return {i[0]: self.metadata[i[0]] for i in items if i[0] in self.metadata}
+
     def get_streams_by_id(
         self,
         content_id: str,
         content_type: str,
         callback: Callable[[list[StremioStream], int, int], Any],
+        refresh: bool = False,
     ):
+        from modules.stream_cache import stream_cache
+
         stream_addons = self._filter_addons(
-            AddonType.STREAM, content_type, content_id, True
+            AddonType.STREAM, content_type, content_id, refresh
         )
 
+        fetched = []
+
         def _get_stream(item: StremioAddon):
-            response = self._get(
-                f"{item.base_url}/{AddonType.STREAM}/{content_type}/{content_id}"
+            streams = (
+                None if refresh else stream_cache.get(content_type, content_id, item)
             )
-            streams = classes_from_list(StremioStream, response.get("streams", []))
+            if streams is None:
+                response = self._get(
+                    f"{item.base_url}/{AddonType.STREAM}/{content_type}/{content_id}"
+                )
+                streams = classes_from_list(StremioStream, response.get("streams", []))
+                if "streams" in response:
+                    stream_cache.set(
+                        content_type, content_id, item, streams, write=False
+                    )
+                    fetched.append(item)
+            for s in streams:
+                s.addon = item
             callback(streams, stream_addons.index(item), len(stream_addons))
 
         thread_function(_get_stream, stream_addons)
+        if fetched:
+            stream_cache.write()
 
     def get_subtitles_by_id(
-        self, content_id: str, content_type: str, filename: str
+        self,
+        content_id: str,
+        content_type: str,
+        filename: str | None = None,
+        video_hash: str | None = None,
+        video_size: int | None = None,
     ) -> list[StremioSubtitle]:
+        extra = urlencode(
+            {
+                k: v
+                for k, v in {
+                    "videoHash": video_hash,
+                    "videoSize": video_size,
+                    "filename": filename,
+                }.items()
+                if v
+            },
+            quote_via=quote,
+        )
+        path = f"{content_id}/{extra}" if extra else content_id
+
         def _get_subs(item: StremioAddon):
             response = self._get(
-                f"{item.base_url}/{AddonType.SUBTITLES}/{content_type}/{content_id}/filename={filename}"
+                f"{item.base_url}/{AddonType.SUBTITLES}/{content_type}/{path}"
             )
             return classes_from_list(StremioSubtitle, response.get("subtitles", []))
 
@@ -363,49 +497,72 @@ class StremioAPI:
     def get_discover_catalogs_by_type(self, catalog_type: str) -> list[Catalog]:
         return [c for c in self.discover_catalogs if c.type == catalog_type]
 
-    def get_notifications(self, library_items: list[StremioLibrary]):
-        def _get_notification_catalog(catalog: Catalog):
-            ids = [
-                l.id
-                for l in library_items
-                if any(
-                    l.id.startswith(prefix)
-                    for prefix in (catalog.addon.manifest.idPrefixes or [])
-                )
-            ]
-
-            if not len(ids):
-                return []
-
-            return self.get_catalog(
-                catalog,
-                ExtraType.NOTIFICATION,
-                ids,
+    @staticmethod
+    def _batch_ids(ids: list[str], max_length: int) -> list[list[str]]:
+        batches = [[]]
+        length = 0
+        for i in ids:
+            if batches[-1] and length + len(i) + 1 > max_length:
+                batches.append([])
+                length = 0
+            batches[-1].append(i)
+            length += len(i) + 1
+        return [b for b in batches if b]
+
+    def get_notification_catalog(
+        self, catalog: Catalog, ids: list[str]
+    ) -> dict[str, StremioMeta | None]:
+        def _get_batch(batch: list[str]) -> dict[str, StremioMeta | None]:
+            metas = self.get_catalog(catalog, ExtraType.NOTIFICATION, batch)
+            if metas is None:
+                return {}
+            results = {m.id: m for m in metas}
+            return {i: results.get(i) for i in batch}
+
+        batches = self._batch_ids(ids, NOTIFICATION_IDS_MAX_LENGTH)
+        return dict(chain(*(r.items() for r in thread_function(_get_batch, batches))))
+
+    def get_notification_ids(
+        self, catalog: Catalog, library_items: list[StremioLibrary]
+    ) -> list[str]:
+        return [
+            l.id
+            for l in library_items
+            if any(
+                l.id.startswith(prefix)
+                for prefix in (catalog.addon.manifest.idPrefixes or [])
             )
-
-        catalogs = self.notification_catalogs
-
-        return list(chain(*thread_function(_get_notification_catalog, catalogs)))
+        ]
 
     def get_catalog(
         self,
         catalog: Catalog,
         extra_type: str = None,
         extra_query: str | list[str] = None,
-    ) -> list[StremioMeta | None]:
+        skip: int = 0,
+    ) -> list[StremioMeta] | None:
         query = (
             f"{catalog.addon.base_url}/{AddonType.CATALOG}/{catalog.type}/{catalog.id}"
         )
+        extras = []
         if extra_type and extra_query:
-            query = f"{query}/{extra_type}={','.join(extra_query) if type(extra_query) is list else extra_query}"
+            extras.append(
+                f"{extra_type}={','.join(extra_query) if type(extra_query) is list else extra_query}"
+            )
+        if skip:
+            extras.append(f"{ExtraType.SKIP}={skip}")
+        if extras:
+            query = f"{query}/{'&'.join(extras)}"
 
         response = self._get(query)
+        if "metas" not in response and "metasDetailed" not in response:
+            return None
         meta = response.get("metas", []) or response.get("metasDetailed", [])
 
         return classes_from_list(StremioMeta, meta)
 
-    def send_events(self, events):
-        return self._post("events", {"events": events})
+    def send_events(self, events) -> bool:
+        return bool(self._post("events", {"events": events}, False))
 
 
 stremio_api = StremioAPI()
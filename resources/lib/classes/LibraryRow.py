@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import xbmc
+
+from classes.StremioLibrary import StremioLibrary
+from classes.StremioMeta import StremioType
+from indexers.base_indexer import NASListItem
+from modules.utils import KodiContentType, run_plugin, update_container
+
+
+@dataclass(slots=True)
+class LibraryRow:
+    library: StremioLibrary
+    id: str = field(init=False)
+    type: str = field(init=False)
+    name: str = field(init=False)
+    poster: str = field(init=False)
+
+    def __post_init__(self):
+        self.id = self.library.id
+        self.type = self.library.type
+        self.name = self.library.name
+        self.poster = self.library.poster
+
+    @property
+    def kodi_type(self) -> str:
+        match self.type:
+            case StremioType.SERIES:
+                return KodiContentType.TVSHOW
+            case StremioType.MOVIE:
+                return KodiContentType.MOVIE
+            case _:
+                return KodiContentType.VIDEO
+
+    def _context_item(self, label: str, params: dict) -> tuple[str, str]:
+        return label, run_plugin(
+            {"mode": "library", "content_id": self.id, "content_type": self.type}
+            | params,
+            build_only=True,
+        )
+
+    def build_list_item(self, base_only=False) -> NASListItem:
+        state = self.library.state
+        list_item = NASListItem()
+        list_item.setLabel(self.name)
+        list_item.setArt(
+            {"poster": self.poster, "icon": self.poster, "tvshow.poster": self.poster}
+        )
+
+        info_tag: xbmc.InfoTagVideo = list_item.getVideoInfoTag()
+        info_tag.setMediaType(self.kodi_type)
+        info_tag.setTitle(self.name)
+        info_tag.setUniqueIDs({"stremio": self.id, "stremio_video": self.id})
+
+        cm_items: list[tuple[str, str]] = []
+        if self.type == StremioType.SERIES:
+            cm_items.append(
+                self._context_item(
+                    "Mark series as Watched",
+                    {"func": "watched_status", "season": -1, "status": True},
+                )
+            )
+            if state.watched:
+                cm_items.append(
+                    self._context_item(
+                        "Mark series as Unwatched",
+                        {"func": "watched_status", "season": -1, "status": False},
+                    )
+                )
+        else:
+            watched = state.timesWatched > 0
+            info_tag.setPlaycount(1 if watched else 0)
+            cm_items.append(
+                self._context_item(
+                    f"Mark as {'Unwatched' if watched else 'Watched'}",
+                    {"func": "watched_status", "status": not watched},
+                )
+            )
+
+        if not base_only:
+            is_in_library = not (self.library.temp or self.library.removed)
+            cm_items.append(
+                self._context_item(
+                    f"{'Remove from' if is_in_library else 'Add to'} Library",
+                    {"func": "status", "status": not is_in_library},
+                )
+            )
+            cm_items.append(
+                (
+                    "View relations",
+                    update_container(
+                        {
+                            "mode": "indexer",
+                            "func": "relations",
+                            "content_id": self.id,
+                            "content_type": self.type,
+                        },
+                        build_only=True,
+                    ),
+                )
+            )
+        list_item.addContextMenuItems(cm_items)
+
+        if state.video_id == self.id and state.timeOffset > 1:
+            info_tag.setResumePoint(state.timeOffset / 1000, state.duration / 1000)
+        return list_item
@@ -11,6 +11,7 @@ class ExtraType(StrEnum):
     SEARCH = auto()
     NOTIFICATION = "lastVideosIds"
     DISCOVER = "genre"
+    SKIP = auto()
 
 
 class AddonType(StrEnum):
@@ -42,6 +43,13 @@ class Catalog(StremioObject):
     def title(self):
         return f"{self.name} - {self.type[:1].upper()}{self.type[1:]}"
 
+    @cached_property
+    def supports_skip(self) -> bool:
+        return (
+            any(e.name == ExtraType.SKIP for e in self.extra)
+            or ExtraType.SKIP in self.extraSupported
+        )
+
 
 @dataclass
 class Resource(StremioObject):
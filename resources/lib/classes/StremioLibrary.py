@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import base64
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
@@ -63,12 +63,54 @@ class BitField8:
         else:
             self.values[index] &= ~mask
 
+    def _clamp_range(self, start: int, end: int | None) -> tuple[int, int]:
+        end = self.length if end is None else end
+        return max(start, 0), min(end, self.length, len(self.values) * 8)
+
+    def count(self, start: int = 0, end: int | None = None) -> int:
+        start, end = self._clamp_range(start, end)
+        if start >= end:
+            return 0
+        first = start // 8
+        chunk = int.from_bytes(self.values[first : (end - 1) // 8 + 1], "little")
+        chunk >>= start - first * 8
+        return (chunk & ((1 << (end - start)) - 1)).bit_count()
+
+    def set_range(self, start: int, end: int | None, val: bool):
+        start, end = self._clamp_range(start, end)
+        if start >= end:
+            return
+        first, last = start // 8, (end - 1) // 8 + 1
+        chunk = int.from_bytes(self.values[first:last], "little")
+        mask = ((1 << (end - start)) - 1) << (start - first * 8)
+        chunk = chunk | mask if val else chunk & ~mask
+        self.values[first:last] = chunk.to_bytes(last - first, "little")
+
     def last_index_of(self, val: bool) -> int:
-        for i in range(self.length - 1, -1, -1):
-            if self.get(i) == val:
-                return i
+        if not val and self.length > len(self.values) * 8:
+            return self.length - 1
+
+        last_byte = (self.length - 1) // 8
+        for index in range(min(last_byte, len(self.values) - 1), -1, -1):
+            byte = self.values[index] if val else ~self.values[index] & 0xFF
+            if index == last_byte:
+                byte &= (1 << (self.length - index * 8)) - 1
+            if byte:
+                return index * 8 + byte.bit_length() - 1
         return -1
 
+    def shifted(self, offset: int, length: int) -> BitField8:
+        source = self.values[: math.ceil(self.length / 8)]
+        byte_shift, bit_shift = divmod(offset, 8)
+        source = source[byte_shift:] if byte_shift >= 0 else bytes(-byte_shift) + source
+        value = int.from_bytes(source, "little")
+        value &= (1 << max(self.length - byte_shift * 8, 0)) - 1
+
+        bf = BitField8(length)
+        value = (value >> bit_shift) & ((1 << length) - 1)
+        bf.values[:] = value.to_bytes(len(bf.values), "little")
+        return bf
+
     def to_packed(self):
         return zlib.compress(self.values)
 
@@ -77,6 +119,10 @@ class BitField8:
 class WatchedBitfield:
     bitfield: BitField8
     video_ids: list[str]
+    video_indexes: dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.video_indexes = {v: idx for idx, v in enumerate(self.video_ids)}
 
     @classmethod
     def construct_from_array(
@@ -107,20 +153,13 @@ class WatchedBitfield:
         anchor_not_found = anchor_video_idx == -1
         must_shift = offset != 0
 
-        if anchor_not_found or must_shift:
-            resized_buf = cls(BitField8(len(video_ids)), video_ids)
-
-            if anchor_not_found:
-                return resized_buf
+        if anchor_not_found:
+            return cls(BitField8(len(video_ids)), video_ids)
 
+        if must_shift:
             decoded_buf = base64.b64decode(serialized_buf.encode("ascii"))
             prev_buf = BitField8.from_packed(decoded_buf, anchor_length)
-
-            for i in range(len(video_ids)):
-                idx_in_prev = i + offset
-                if 0 <= idx_in_prev < prev_buf.length:
-                    resized_buf.set(i, prev_buf.get(idx_in_prev))
-            return resized_buf
+            return cls(prev_buf.shifted(offset, len(video_ids)), video_ids)
 
         decoded_buf = base64.b64decode(serialized_buf.encode("ascii"))
         buf = BitField8.from_packed(decoded_buf, len(video_ids))
@@ -133,18 +172,19 @@ class WatchedBitfield:
         self.bitfield.set(idx, v)
 
     def set_video(self, video_id: str, v: bool):
-        try:
-            idx = self.video_ids.index(video_id)
+        if (idx := self.video_indexes.get(video_id)) is not None:
             self.bitfield.set(idx, v)
-        except ValueError:
-            pass
 
     def get_video(self, video_id: str) -> bool:
-        try:
-            idx = self.video_ids.index(video_id)
+        if (idx := self.video_indexes.get(video_id)) is not None:
             return self.bitfield.get(idx)
-        except ValueError:
-            return False
+        return False
+
+    def count(self, start: int = 0, end: int | None = None) -> int:
+        return self.bitfield.count(start, end)
+
+    def set_range(self, start: int, end: int | None, v: bool):
+        self.bitfield.set_range(start, end, v)
 
     def serialize(self) -> str:
         packed = self.bitfield.to_packed()
@@ -166,16 +206,47 @@ class WatchState(StremioObject):
     watched: str | None = field(default=None)
     noNotif: bool = field(default=False)
 
-    watched_bitfield: WatchedBitfield | None = field(
+    bitfield_video_ids: list[str] | None = field(
+        init=False, repr=False, compare=False, default=None
+    )
+    bitfield_source: str | None = field(
+        init=False, repr=False, compare=False, default=None
+    )
+    bitfield_dirty: bool = field(init=False, repr=False, compare=False, default=False)
+    cached_bitfield: WatchedBitfield | None = field(
         init=False, repr=False, compare=False, default=None
     )
 
+    @property
+    def watched_bitfield(self) -> WatchedBitfield | None:
+        if self.bitfield_video_ids is None:
+            return None
+        if self.cached_bitfield is None or (
+            not self.bitfield_dirty and self.bitfield_source != self.watched
+        ):
+            self.cached_bitfield = (
+                WatchedBitfield.construct_and_resize(
+                    self.watched, self.bitfield_video_ids
+                )
+                if self.watched
+                else WatchedBitfield.construct_from_array([], self.bitfield_video_ids)
+            )
+            self.bitfield_source = self.watched
+            self.bitfield_dirty = False
+        return self.cached_bitfield
+
     def create_bitfield(self, video_ids: list[str]):
-        self.watched_bitfield = (
-            WatchedBitfield.construct_and_resize(self.watched, video_ids)
-            if self.watched
-            else WatchedBitfield.construct_from_array([], video_ids)
-        )
+        if video_ids == self.bitfield_video_ids:
+            return
+        self.flush_bitfield()
+        self.bitfield_video_ids = video_ids
+        self.cached_bitfield = None
+
+    def flush_bitfield(self):
+        if self.bitfield_dirty and self.cached_bitfield:
+            self.watched = self.cached_bitfield.serialize()
+            self.bitfield_source = self.watched
+            self.bitfield_dirty = False
 
 
 @dataclass
@@ -199,6 +270,17 @@ class StremioLibrary(StremioObject):
     def mtime(self):
         return self._mtime
 
+    def update_from(self, other: StremioLibrary):
+        if self.state.watched != other.state.watched:
+            self.state.cached_bitfield = None
+            self.state.bitfield_dirty = False
+        for f in fields(self):
+            if f.init and f.name != "state":
+                setattr(self, f.name, getattr(other, f.name))
+        for f in fields(self.state):
+            if f.init:
+                setattr(self.state, f.name, getattr(other.state, f.name))
+
     def update_progress(
         self,
         progress: int,
@@ -228,7 +310,7 @@ class StremioLibrary(StremioObject):
             state.timesWatched += 1
             if state.watched_bitfield:
                 state.watched_bitfield.set_video(video_id, True)
-                state.watched = state.watched_bitfield.serialize()
+                state.bitfield_dirty = True
 
         if self.temp and not state.timesWatched:
             self.removed = True
@@ -243,10 +325,6 @@ class StremioLibrary(StremioObject):
     ):
         state = self.state
         if state.timeOffset > (state.duration * STREMIO_CREDITS_COEFFICIENT):
-            from apis.StremioAPI import stremio_api
-
-            stremio_api.get_subtitles_by_id(video_id, self.type, "")
-
             state.timeOffset = 0
             if episode is not None and episode.next_episode:
                 state.video_id = episode.next_episode.id
@@ -258,6 +336,8 @@ class StremioLibrary(StremioObject):
                 if not get_setting("playback.auto_play_next_episode"):
                     return
 
+                from modules.sources import PlayTypes
+
                 run_plugin(
                     {
                         "mode": "playback",
@@ -265,6 +345,11 @@ class StremioLibrary(StremioObject):
                         "content_id": self.id,
                         "content_type": self.type,
                         "episode": episode.next_episode.idx,
+                        "play_type": (
+                            PlayTypes.AUTOPLAY
+                            if get_setting("playback.binge_mode")
+                            else PlayTypes.DEFAULT
+                        ),
                     }
                 )
 
@@ -281,10 +366,15 @@ class StremioLibrary(StremioObject):
         self._set_time(True)
         self.push()
 
-    def mark_watched(self, status, video_id):
-        if video_id:
+    def mark_watched(
+        self, status, video_id, video_range: tuple[int, int] | None = None
+    ):
+        if video_range is not None:
+            self.state.watched_bitfield.set_range(*video_range, status)
+            self.state.bitfield_dirty = True
+        elif video_id:
             self.state.watched_bitfield.set_video(video_id, status)
-            self.state.watched = self.state.watched_bitfield.serialize()
+            self.state.bitfield_dirty = True
         else:
             self.state.timesWatched = int(status)
         self.push()
@@ -293,6 +383,7 @@ class StremioLibrary(StremioObject):
         from apis.StremioAPI import stremio_api
 
         self._set_time(False)
+        self.state.flush_bitfield()
         stremio_api.set_data(self)
         kodi_refresh()
 
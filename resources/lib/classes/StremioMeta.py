@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import StrEnum, auto
@@ -86,6 +87,10 @@ class Video(StremioObject):
             data["released"] = data["firstAired"]
         return super().transform_dict(data)
 
+    @property
+    def season_number(self) -> int:
+        return self.season or 0
+
     @property
     def watched(self):
         try:
@@ -162,7 +167,7 @@ class Video(StremioObject):
 
 @dataclass
 class StremioMeta(StremioObject):
-    from classes.StremioLibrary import StremioLibrary
+    from classes.StremioLibrary import StremioLibrary, WatchedBitfield
 
     id: str
     type: str
@@ -221,7 +226,9 @@ class StremioMeta(StremioObject):
 
     @cached_property
     def seasons(self) -> list[int]:
-        return sorted(list({v.season for v in self.videos}), key=lambda k: (k == 0, k))
+        return sorted(
+            list({v.season_number for v in self.videos}), key=lambda k: (k == 0, k)
+        )
 
     @cached_property
     def relations(self) -> list[Link]:
@@ -230,13 +237,30 @@ class StremioMeta(StremioObject):
     @property
     def watched(self) -> bool:
         if self.type == StremioType.SERIES:
-            return (
-                not any(not i.watched for i in self.videos if i.season != 0)
-                and self.videos
-            )
+            if not self.videos or not (bitfield := self.watched_bitfield()):
+                return False
+            start, end = self.video_range()
+            return bitfield.count(start, end) == end - start
         else:
             return self.library.state.timesWatched > 0
 
+    def watched_bitfield(self) -> WatchedBitfield | None:
+        if self.videos:
+            self.library.state.create_bitfield([v.id for v in self.videos])
+        return self.library.state.watched_bitfield
+
+    def video_range(self, season: int | None = None) -> tuple[int, int]:
+        if season is None:
+            return bisect_right(self.videos, 0, key=lambda v: v.season_number), len(
+                self.videos
+            )
+        if season < 0:
+            return 0, len(self.videos)
+        return (
+            bisect_left(self.videos, season, key=lambda v: v.season_number),
+            bisect_right(self.videos, season, key=lambda v: v.season_number),
+        )
+
     @cached_property
     def kodi_type(self) -> str:
         match self.type:
@@ -280,8 +304,8 @@ class StremioMeta(StremioObject):
         if self.videos:
             self.videos.sort(
                 key=lambda e: (
-                    e.season,
-                    e.episode,
+                    e.season_number,
+                    e.episode or 0,
                     e.released,
                 )
             )
@@ -309,21 +333,18 @@ class StremioMeta(StremioObject):
             }
         )
 
-        if (
-            not base_only
-            and self.videos
-            and (bitfield := self.library.state.watched_bitfield)
-        ):
-            episodes = [v for v in self.videos if v.season != 0]
-            watched_episodes = [v for v in episodes if bitfield.get_video(v.id)]
+        if not base_only and self.videos and (bitfield := self.watched_bitfield()):
+            start, end = self.video_range()
+            episodes = end - start
+            watched_episodes = bitfield.count(start, end)
             list_item.setProperties(
                 {
-                    "totalepisodes": len(episodes),
-                    "totalseasons": len({v.season for v in episodes}),
-                    "watchedepisodes": len(watched_episodes),
-                    "unwatchedepisodes": len(episodes) - len(watched_episodes),
+                    "totalepisodes": episodes,
+                    "totalseasons": len([s for s in self.seasons if s != 0]),
+                    "watchedepisodes": watched_episodes,
+                    "unwatchedepisodes": episodes - watched_episodes,
                     "watchedprogress": (
-                        str((len(watched_episodes) / len(episodes)) * 100)
+                        str((watched_episodes / episodes) * 100)
                         if watched_episodes != episodes
                         else 0
                     ),
@@ -377,6 +398,23 @@ class StremioMeta(StremioObject):
                     ),
                 ),
             )
+        elif self.type == StremioType.SERIES and not base_only:
+            cm_items.append(
+                (
+                    f"Mark series as {'Unwatched' if self.watched else 'Watched'}",
+                    run_plugin(
+                        {
+                            "mode": "library",
+                            "func": "watched_status",
+                            "content_id": self.id,
+                            "content_type": self.type,
+                            "season": -1,
+                            "status": not self.watched,
+                        },
+                        build_only=True,
+                    ),
+                ),
+            )
         if not base_only:
             is_in_library = not (self.library.temp or self.library.removed)
             cm_items.append(
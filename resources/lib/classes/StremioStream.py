@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any
 
+from classes.StremioAddon import StremioAddon
 from classes.StremioSubtitle import StremioSubtitle
 from classes.base_class import StremioObject
 
@@ -30,6 +31,17 @@ class StremioStream(StremioObject):
     subtitles: list[StremioSubtitle] = field(default_factory=list)
     sources: list[str] = field(default_factory=list)
     behaviorHints: BehaviorHints = field(default_factory=BehaviorHints)
+    addon: StremioAddon | None = field(
+        init=False, repr=False, compare=False, default=None
+    )
+    also_from: list[str] = field(
+        init=False, repr=False, compare=False, default_factory=list
+    )
+    cached: bool = field(init=False, repr=False, compare=False, default=False)
+
+    @property
+    def addon_name(self) -> str:
+        return self.addon.manifest.name if self.addon else ""
 
     @classmethod
     def transform_dict(cls, data: dict[str, Any]) -> dict[str, Any]:
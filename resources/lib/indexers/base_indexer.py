@@ -1,14 +1,19 @@
-from dataclasses import dataclass, field
-from typing import TypeVar, Generic
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Iterator, TypeVar, Generic
 
-from xbmc import getInfoLabel
+from xbmc import LOGERROR, getInfoLabel
 from xbmcgui import ListItem
+from xbmcplugin import addDirectoryItems
 
 from addon import nas_addon
-from modules.utils import thread_function
+from modules.utils import log
 
 T = TypeVar("T")
 
+INDEXER_WORKERS = 8
+DIRECTORY_CHUNK_SIZE = 50
+
 
 @dataclass
 class NASListItem(ListItem):
@@ -27,8 +32,41 @@ class BaseIndexer(Generic[T]):
     def _build_content(self, item: T, position: int) -> tuple[str, ListItem, bool]:
         raise NotImplementedError("Subclasses must implement build_content")
 
-    def _worker(self, data: list[T]) -> list[tuple[str, ListItem, bool] | None]:
-        def _build(item: T) -> tuple[str, ListItem, bool] | None:
-            return self._build_content(item, data.index(item))
+    def _cached(self, versions: list, builder: Callable[[bool], Any]) -> Any:
+        from modules.directory_cache import directory_cache
+
+        key = "|".join(
+            [
+                type(self).__name__,
+                *(
+                    f"{f.name}={getattr(self, f.name)}"
+                    for f in fields(self)
+                    if f.init and f.name != "refreshed"
+                ),
+            ]
+        )
+        return directory_cache.get(key, versions, builder)
+
+    def _iter_content(
+        self, data: list[T]
+    ) -> Iterator[tuple[str, ListItem, bool] | None]:
+        def _build(item: T, position: int) -> tuple[str, ListItem, bool] | None:
+            try:
+                return self._build_content(item, position)
+            except Exception as e:
+                log(str(e), LOGERROR)
+                return None
+
+        with ThreadPoolExecutor(INDEXER_WORKERS) as executor:
+            yield from executor.map(_build, data, range(len(data)))
 
-        return thread_function(_build, data)
+    def _add_directory_items(self, handle: int, data: list[T], extra_items=0):
+        chunk = []
+        for content in self._iter_content(data):
+            if content:
+                chunk.append(content)
+            if len(chunk) >= DIRECTORY_CHUNK_SIZE:
+                addDirectoryItems(handle, chunk, len(data) + extra_items)
+                chunk = []
+        if chunk:
+            addDirectoryItems(handle, chunk, len(data) + extra_items)
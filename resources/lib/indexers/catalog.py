@@ -4,20 +4,27 @@ import sys
 from dataclasses import dataclass
 from enum import IntEnum, auto
 
+from classes.LibraryRow import LibraryRow
 from classes.StremioAddon import Catalog, ExtraType
 from classes.StremioMeta import StremioMeta, StremioType
 from indexers.base_indexer import BaseIndexer, NASListItem
 from modules.utils import KodiDirectoryType, build_url, run_plugin
+from modules.versions import DataVersion
 from xbmc import InfoTagVideo
 from xbmcplugin import addDirectoryItems, endOfDirectory, setContent, setPluginCategory
 
 
+LIBRARY_PAGE_SIZE = 200
+
+
 class CatalogType(IntEnum):
     CONTINUE = auto()
     HOME = auto()
     DISCOVER = auto()
     LIBRARY = auto()
     SEARCH = auto()
+    SEARCH_ALL = auto()
+    SEARCH_LOCAL = auto()
 
 
 @dataclass
@@ -28,13 +35,48 @@ class Catalog(BaseIndexer[StremioMeta]):
     search: str | None = None
     genre: str | None = None
     library_filter: str | None = None
+    skip: int | None = 0
 
     def __post_init__(self):
         handle = int(sys.argv[1])
 
+        if self.catalog_type == CatalogType.CONTINUE:
+            from modules.widgets import home_widgets
+
+            name, data = home_widgets.get_continue()
+            next_skip = None
+        elif self.catalog_type == CatalogType.HOME and not self.skip:
+            from modules.widgets import home_widgets
+
+            name, data, next_skip = home_widgets.get_home(self.idx)
+        elif self.catalog_type == CatalogType.SEARCH_ALL and not self._search_done():
+            name, data, next_skip = self._load()
+        else:
+            versions = (
+                [DataVersion.DATASTORE, DataVersion.METADATA]
+                if self.catalog_type in [CatalogType.LIBRARY, CatalogType.SEARCH_LOCAL]
+                else [DataVersion.ADDONS, DataVersion.DATASTORE]
+            )
+            name, data, next_skip = self._cached(versions, lambda _: self._load())
+        next_item = self._next_page_item(next_skip) if next_skip else None
+
+        self._add_directory_items(handle, data, 1 if next_item else 0)
+        if next_item:
+            addDirectoryItems(handle, [next_item])
+        setContent(handle, KodiDirectoryType.TVSHOWS)
+        setPluginCategory(handle, name)
+        endOfDirectory(handle, cacheToDisc=not self.external)
+
+    def _search_done(self) -> bool:
+        from modules.search import unified_search
+
+        return unified_search.is_complete(self.search)
+
+    def _load(self) -> tuple[str | None, list[StremioMeta | LibraryRow], int | None]:
         name: str | None = None
-        data: list[StremioMeta] | None = None
+        data: list[StremioMeta | LibraryRow] | None = None
         catalog: Catalog | None = None
+        next_skip: int | None = None
 
         from apis.StremioAPI import stremio_api
 
@@ -62,14 +104,28 @@ class Catalog(BaseIndexer[StremioMeta]):
                     else None
                 )
             case CatalogType.LIBRARY:
-                data = stremio_api.get_library(self.library_filter)
+                skip = self.skip or 0
+                items = stremio_api.get_library_items(self.library_filter)
+                data = [LibraryRow(i) for i in items[skip : skip + LIBRARY_PAGE_SIZE]]
                 name = f"Library - {self.library_filter or 'All'}"
+                if len(items) > skip + LIBRARY_PAGE_SIZE:
+                    next_skip = skip + LIBRARY_PAGE_SIZE
             case CatalogType.SEARCH:
                 catalog = (
                     c[self.idx]
                     if len(c := stremio_api.search_catalogs) > self.idx
                     else None
                 )
+            case CatalogType.SEARCH_ALL:
+                from modules.search import unified_search
+
+                data = unified_search.search(self.search)
+                name = f"Search - {self.search}"
+            case CatalogType.SEARCH_LOCAL:
+                from modules.search import local_results
+
+                data = local_results(self.search)
+                name = f"Library - {self.search}"
 
         if not data and catalog:
             extra_type, extra_query = (
@@ -77,16 +133,40 @@ class Catalog(BaseIndexer[StremioMeta]):
                 if self.search
                 else [ExtraType.DISCOVER, self.genre] if self.genre else [None, None]
             )
-            data = stremio_api.get_catalog(catalog, extra_type, extra_query)
-            name = catalog.title
+            from modules.catalog_pages import catalog_pages
 
-        if not data:
-            data = []
-
-        addDirectoryItems(handle, self._worker(data))
-        setContent(handle, KodiDirectoryType.TVSHOWS)
-        setPluginCategory(handle, name)
-        endOfDirectory(handle, cacheToDisc=not self.external)
+            skip = self.skip or 0
+            data = catalog_pages.get(catalog, extra_type, extra_query, skip)
+            name = catalog.title
+            if data and catalog.supports_skip:
+                next_skip = skip + len(data)
+                catalog_pages.prefetch(catalog, extra_type, extra_query, next_skip)
+
+        return name, data or [], next_skip
+
+    def _next_page_item(self, skip: int) -> tuple[str, NASListItem, bool]:
+        list_item = NASListItem()
+        list_item.setLabel("Next page")
+        list_item.setArt({"icon": "DefaultFolder.png"})
+        list_item.setProperty("SpecialSort", "bottom")
+        url_params = build_url(
+            {
+                k: v
+                for k, v in {
+                    "mode": "indexer",
+                    "func": "catalog",
+                    "catalog_type": self.catalog_type,
+                    "idx": self.idx,
+                    "content_type": self.content_type,
+                    "search": self.search,
+                    "genre": self.genre,
+                    "library_filter": self.library_filter,
+                    "skip": skip,
+                }.items()
+                if v is not None
+            }
+        )
+        return url_params, list_item, True
 
     def _build_content(
         self, item: StremioMeta, position: int
@@ -1,12 +1,13 @@
 import sys
 from dataclasses import dataclass
 
-from xbmcplugin import addDirectoryItems, setPluginCategory, endOfDirectory
+from xbmcplugin import setPluginCategory, endOfDirectory
 
 from apis.StremioAPI import stremio_api
 from classes.StremioAddon import Catalog, ExtraType
 from indexers.base_indexer import BaseIndexer, NASListItem
 from indexers.catalog import CatalogType
+from modules.versions import DataVersion
 from modules.utils import build_url
 
 
@@ -20,7 +21,10 @@ class Discover(BaseIndexer[Catalog | str]):
 
         data: [Catalog | str]
         title: str
-        catalogs = stremio_api.get_discover_catalogs_by_type(self.content_type)
+        catalogs = self._cached(
+            [DataVersion.ADDONS],
+            lambda _: stremio_api.get_discover_catalogs_by_type(self.content_type),
+        )
         if self.idx is None:
             data = catalogs
             title = self.content_type
@@ -35,7 +39,7 @@ class Discover(BaseIndexer[Catalog | str]):
                 data.insert(0, None)
             title = catalogs[self.idx].title
 
-        addDirectoryItems(handle, self._worker(data))
+        self._add_directory_items(handle, data)
         setPluginCategory(handle, title.capitalize())
         endOfDirectory(handle, cacheToDisc=not self.external)
 
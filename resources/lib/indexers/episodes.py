@@ -1,12 +1,13 @@
 import sys
 from dataclasses import dataclass, field
 
-from xbmcplugin import addDirectoryItems, setContent, setPluginCategory, endOfDirectory
+from xbmcplugin import setContent, setPluginCategory, endOfDirectory
 
 from apis.StremioAPI import stremio_api
 from classes.StremioMeta import StremioMeta, Video, StremioType
 from indexers.base_indexer import BaseIndexer
 from modules.utils import build_url, KodiDirectoryType
+from modules.versions import DataVersion
 
 
 @dataclass
@@ -19,9 +20,14 @@ class Episodes(BaseIndexer[Video]):
     def __post_init__(self):
         handle = int(sys.argv[1])
 
-        self.series = stremio_api.get_metadata_by_id(self.content_id, self.content_type)
+        self.series = self._cached(
+            [DataVersion.METADATA, DataVersion.ADDONS],
+            lambda stale: stremio_api.get_metadata_by_id(
+                self.content_id, self.content_type, refresh=stale
+            ),
+        )
 
-        addDirectoryItems(handle, [i for i in self._worker(self.series.videos) if i])
+        self._add_directory_items(handle, self.series.videos)
         setContent(handle, KodiDirectoryType.EPISODES)
         setPluginCategory(
             handle, f"Season {self.season}" if self.season else "Specials"
@@ -29,7 +35,7 @@ class Episodes(BaseIndexer[Video]):
         endOfDirectory(handle, cacheToDisc=not self.external)
 
     def _build_content(self, item: Video, position):
-        if item.season != self.season and self.season >= 0:
+        if item.season_number != self.season and self.season >= 0:
             return
 
         list_item = item.build_list_item()
@@ -90,6 +90,24 @@ class Navigator:
         if not query:
             return self.end_directory(False)
 
+        add(
+            {
+                "mode": "indexer",
+                "func": "catalog",
+                "catalog_type": CatalogType.SEARCH_ALL,
+                "search": query,
+            },
+            "All catalogs",
+        )
+        add(
+            {
+                "mode": "indexer",
+                "func": "catalog",
+                "catalog_type": CatalogType.SEARCH_LOCAL,
+                "search": query,
+            },
+            "Library and recently viewed",
+        )
         for i, c in enumerate(stremio_api.search_catalogs):
             add(
                 {
@@ -1,49 +1,70 @@
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from xbmcgui import ListItem
-from xbmcplugin import addDirectoryItems, setContent, setPluginCategory, endOfDirectory
+from xbmcplugin import setContent, setPluginCategory, endOfDirectory
 
 from apis.StremioAPI import stremio_api
-from classes.StremioMeta import Link, StremioType
+from classes.StremioMeta import Link, StremioMeta, StremioType
 from indexers.base_indexer import BaseIndexer, NASListItem
 from modules.utils import build_url, KodiDirectoryType
+from modules.versions import DataVersion
+
+
+def _target(link: Link) -> tuple[str, str]:
+    segments = link.url.split("/")
+    return segments[-1], segments[-2]
 
 
 @dataclass
 class Relations(BaseIndexer[Link]):
     content_id: str
     content_type: str
+    metas: dict[str, StremioMeta] = field(init=False, default_factory=dict)
 
     def __post_init__(self):
         handle = int(sys.argv[1])
 
-        series = stremio_api.get_metadata_by_id(self.content_id, self.content_type)
-        addDirectoryItems(handle, self._worker(series.relations))
+        def _load(stale: bool) -> tuple[StremioMeta, dict[str, StremioMeta]]:
+            series = stremio_api.get_metadata_by_id(
+                self.content_id, self.content_type, refresh=stale
+            )
+            return series, stremio_api.get_metadata_by_ids(
+                [_target(l) for l in series.relations]
+            )
+
+        series, self.metas = self._cached(
+            [DataVersion.METADATA, DataVersion.ADDONS], _load
+        )
+        self._add_directory_items(handle, series.relations)
         setContent(handle, KodiDirectoryType.SETS)
         setPluginCategory(handle, series.name)
         endOfDirectory(handle, cacheToDisc=not self.external)
 
     def _build_content(self, item: Link, position: int) -> tuple[str, ListItem, bool]:
-        list_item = NASListItem()
+        content_id, content_type = _target(item)
+        if meta := self.metas.get(content_id):
+            list_item = meta.build_list_item()
+        else:
+            list_item = NASListItem()
         list_item.setLabel(item.name)
-        segments = item.url.split("/")
         url_params = (
             build_url(
                 {
                     "mode": "playback",
                     "func": "media",
-                    "content_id": segments[-1],
+                    "content_id": content_id,
                     "content_type": StremioType.MOVIE,
                 }
             )
-            if segments[-2] == StremioType.MOVIE
+            if content_type == StremioType.MOVIE
             else build_url(
                 {
                     "mode": "indexer",
                     "func": "seasons",
-                    "content_id": segments[-1],
+                    "content_id": content_id,
+                    "content_type": content_type,
                 }
             )
         )
-        return url_params, list_item, True
+        return url_params, list_item, content_type != StremioType.MOVIE
@@ -1,12 +1,13 @@
 import sys
 from dataclasses import dataclass, field
 
-from xbmcplugin import addDirectoryItems, setContent, setPluginCategory, endOfDirectory
+from xbmcplugin import setContent, setPluginCategory, endOfDirectory
 
 from apis.StremioAPI import stremio_api
 from classes.StremioMeta import StremioMeta
 from indexers.base_indexer import BaseIndexer, NASListItem
-from modules.utils import build_url, KodiDirectoryType
+from modules.utils import build_url, run_plugin, KodiDirectoryType
+from modules.versions import DataVersion
 
 
 @dataclass
@@ -18,7 +19,12 @@ class Seasons(BaseIndexer[int]):
     def __post_init__(self):
         handle = int(sys.argv[1])
 
-        self.series = stremio_api.get_metadata_by_id(self.content_id, self.content_type)
+        self.series = self._cached(
+            [DataVersion.METADATA, DataVersion.ADDONS],
+            lambda stale: stremio_api.get_metadata_by_id(
+                self.content_id, self.content_type, refresh=stale
+            ),
+        )
 
         data = self.series.seasons
         if len(data) == 1:
@@ -31,7 +37,7 @@ class Seasons(BaseIndexer[int]):
                 season=data[0],
             )
 
-        addDirectoryItems(handle, self._worker(data))
+        self._add_directory_items(handle, data)
         setContent(handle, KodiDirectoryType.SEASONS)
         setPluginCategory(handle, self.series.name)
         endOfDirectory(handle, cacheToDisc=not self.external)
@@ -39,11 +45,28 @@ class Seasons(BaseIndexer[int]):
     def _build_content(self, item: int, position: int):
         list_item = NASListItem()
         list_item.setLabel(f"Season {item}" if item != 0 else "Specials")
+        start, end = self.series.video_range(item)
+        bitfield = self.series.watched_bitfield()
+        watched = bool(bitfield) and bitfield.count(start, end) == end - start
         info_tag = list_item.getVideoInfoTag()
-        info_tag.setPlaycount(
-            0
-            if any(v.season == item and not v.watched for v in self.series.videos)
-            else 1
+        info_tag.setPlaycount(1 if watched else 0)
+        list_item.addContextMenuItems(
+            [
+                (
+                    f"Mark season as {'Unwatched' if watched else 'Watched'}",
+                    run_plugin(
+                        {
+                            "mode": "library",
+                            "func": "watched_status",
+                            "content_id": self.content_id,
+                            "content_type": self.content_type,
+                            "season": item,
+                            "status": not watched,
+                        },
+                        build_only=True,
+                    ),
+                )
+            ]
         )
         url_params = build_url(
             {
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from classes.StremioStream import StremioStream
+from modules.cache import FileCache
+from modules.ranking import parse_stream
+
+
+def _normalize_name(stream: StremioStream) -> str:
+    return " ".join((stream.name or "").lower().split())
+
+
+def _quality(stream: StremioStream) -> str | None:
+    return parse_stream(stream).resolution_label
+
+
+@dataclass
+class BingeChoices:
+    cache: FileCache = field(init=False, default_factory=lambda: FileCache("binge"))
+
+    def remember(self, content_id: str, stream: StremioStream):
+        if not stream.addon:
+            return
+        self.cache.set(
+            content_id,
+            {
+                "addon": stream.addon.transportUrl,
+                "name": _normalize_name(stream),
+                "quality": _quality(stream),
+            },
+        )
+
+    def has_choice(self, content_id: str) -> bool:
+        return self.cache.get(content_id) is not None
+
+    def match(
+        self, content_id: str, streams: list[StremioStream]
+    ) -> StremioStream | None:
+        choice = self.cache.get(content_id)
+        if not choice:
+            return None
+
+        candidates = [
+            s for s in streams if s.addon and s.addon.transportUrl == choice["addon"]
+        ]
+        return next(
+            (s for s in candidates if _normalize_name(s) == choice["name"]),
+            next(
+                (
+                    s
+                    for s in candidates
+                    if choice["quality"] and _quality(s) == choice["quality"]
+                ),
+                None,
+            ),
+        )
+
+
+binge_choices = BingeChoices()
@@ -0,0 +1,106 @@
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from threading import RLock, get_ident
+from typing import Any
+
+import xbmc
+
+from addon import nas_addon
+from modules.utils import log
+
+
+@dataclass
+class FileCache:
+    filename: str
+    path: str = field(init=False)
+    entries: dict[str, dict[str, Any]] = field(init=False, default_factory=dict)
+    lock: RLock = field(init=False, default_factory=RLock)
+    loaded_mtime: float | None = field(init=False, default=None)
+    pending: dict[str, dict[str, Any] | None] = field(init=False, default_factory=dict)
+    cleared: bool = field(init=False, default=False)
+
+    def __post_init__(self):
+        self.path = nas_addon.get_file_path(f"{self.filename}.json")
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self):
+        with self.lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                return
+            if mtime == self.loaded_mtime:
+                return
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    entries = json.load(f)
+                if self.cleared:
+                    entries = {}
+                for key, entry in self.pending.items():
+                    if entry is None:
+                        entries.pop(key, None)
+                    else:
+                        entries[key] = entry
+                self.entries = entries
+                self.loaded_mtime = mtime
+            except Exception as e:
+                log(str(e), xbmc.LOGERROR)
+
+    def write(self):
+        with self.lock:
+            self.load()
+            temp_path = f"{self.path}.{get_ident()}"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.entries, f, ensure_ascii=False)
+                os.replace(temp_path, self.path)
+                self.loaded_mtime = os.path.getmtime(self.path)
+                self.pending.clear()
+                self.cleared = False
+            except Exception as e:
+                log(str(e), xbmc.LOGERROR)
+
+    def keys(self) -> list[str]:
+        self.load()
+        return list(self.entries.keys())
+
+    def age(self, key: str) -> float | None:
+        self.load()
+        entry = self.entries.get(key)
+        return time.time() - entry["time"] if entry else None
+
+    def get(self, key: str, ttl: float | None = None, default=None):
+        self.load()
+        entry = self.entries.get(key)
+        if entry is None or (ttl is not None and time.time() - entry["time"] > ttl):
+            return default
+        return entry["data"]
+
+    def set(self, key: str, data, write=True):
+        with self.lock:
+            self.load()
+            self.entries[key] = self.pending[key] = {"time": time.time(), "data": data}
+            if write:
+                self.write()
+
+    def delete(self, key: str, write=True):
+        with self.lock:
+            self.load()
+            if self.entries.pop(key, None) is not None:
+                self.pending[key] = None
+                if write:
+                    self.write()
+
+    def clear(self, write=True):
+        with self.lock:
+            self.load()
+            self.entries = {}
+            self.pending.clear()
+            self.cleared = True
+            if write:
+                self.write()
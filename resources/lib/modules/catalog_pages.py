@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock, Thread
+
+from classes.StremioAddon import Catalog
+from classes.StremioMeta import StremioMeta
+from modules.cache import FileCache
+from modules.utils import classes_from_list, log
+from modules.versions import DataVersion, get_version
+
+CATALOG_PAGE_TTL = 3600
+CATALOG_MEMORY_PAGES = 20
+
+
+@dataclass
+class CatalogPages:
+    cache: FileCache = field(
+        init=False, default_factory=lambda: FileCache("catalog_pages")
+    )
+    pages: OrderedDict[str, tuple[str, list[StremioMeta]]] = field(
+        init=False, default_factory=OrderedDict
+    )
+    prefetching: set[str] = field(init=False, default_factory=set)
+    lock: Lock = field(init=False, default_factory=Lock)
+
+    @staticmethod
+    def _key(
+        catalog: Catalog, extra_type: str | None, extra_query: str | None, skip: int
+    ) -> str:
+        return "|".join(
+            [
+                catalog.addon.transportUrl,
+                catalog.type,
+                catalog.id,
+                f"{extra_type}={extra_query}" if extra_type and extra_query else "",
+                str(skip),
+            ]
+        )
+
+    def _remember(self, key: str, page: list[StremioMeta]):
+        with self.lock:
+            self.pages[key] = (get_version(DataVersion.DATASTORE), page)
+            self.pages.move_to_end(key)
+            while len(self.pages) > CATALOG_MEMORY_PAGES:
+                self.pages.popitem(last=False)
+
+    @staticmethod
+    def _rebind(page: list[StremioMeta]) -> list[StremioMeta]:
+        from apis.StremioAPI import stremio_api
+
+        for meta in page:
+            meta.library = stremio_api.get_data_by_meta(meta)
+            if meta.videos:
+                meta.library.state.create_bitfield([v.id for v in meta.videos])
+        return page
+
+    def _store(self, key: str, page: list[StremioMeta]):
+        with self.cache.lock:
+            now = time.time()
+            for k in self.cache.keys():
+                if now - self.cache.entries[k]["time"] > CATALOG_PAGE_TTL:
+                    self.cache.delete(k, write=False)
+            self.cache.set(key, [m.as_dict() for m in page])
+
+    def peek(
+        self,
+        catalog: Catalog,
+        extra_type: str | None,
+        extra_query: str | None,
+        skip: int,
+    ) -> list[StremioMeta] | None:
+        key = self._key(catalog, extra_type, extra_query, skip)
+        age = self.cache.age(key)
+        if key in self.pages and age is not None and age < CATALOG_PAGE_TTL:
+            version, page = self.pages[key]
+            if version != get_version(DataVersion.DATASTORE):
+                page = self._rebind(page)
+                self._remember(key, page)
+            return page
+        page = self.cache.get(key, CATALOG_PAGE_TTL)
+        if page is None:
+            return None
+        page = classes_from_list(StremioMeta, page)
+        self._remember(key, page)
+        return page
+
+    def get(
+        self,
+        catalog: Catalog,
+        extra_type: str | None = None,
+        extra_query: str | None = None,
+        skip: int = 0,
+    ) -> list[StremioMeta] | None:
+        from apis.StremioAPI import stremio_api
+
+        if (page := self.peek(catalog, extra_type, extra_query, skip)) is not None:
+            return page
+
+        from modules.search_index import search_index
+
+        page = stremio_api.get_catalog(catalog, extra_type, extra_query, skip)
+        if not page:
+            return page
+        key = self._key(catalog, extra_type, extra_query, skip)
+        self._store(key, page)
+        self._remember(key, page)
+        search_index.add_metas(page)
+        return page
+
+    def prefetch(
+        self,
+        catalog: Catalog,
+        extra_type: str | None,
+        extra_query: str | None,
+        skip: int,
+    ):
+        key = self._key(catalog, extra_type, extra_query, skip)
+        with self.lock:
+            if key in self.prefetching:
+                return
+            self.prefetching.add(key)
+
+        def _prefetch():
+            try:
+                log(f"Prefetching catalog page {key}")
+                self.get(catalog, extra_type, extra_query, skip)
+            finally:
+                with self.lock:
+                    self.prefetching.discard(key)
+
+        Thread(target=_prefetch).start()
+
+
+catalog_pages = CatalogPages()
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import RLock, Thread
+
+from classes.StremioLibrary import StremioLibrary
+from classes.StremioMeta import StremioMeta, StremioType
+from modules.cache import FileCache
+from modules.notifications import is_notifiable, notifications
+from modules.utils import thread_function
+
+
+def _in_progress(item: StremioLibrary) -> bool:
+    return (
+        item.type != StremioType.OTHER
+        and (item.temp or not item.removed)
+        and item.state.timeOffset > 0
+    )
+
+
+def _timestamp(value: datetime | None) -> float | None:
+    return value.timestamp() if value else None
+
+
+@dataclass
+class ContinueWatching:
+    cache: FileCache = field(
+        init=False, default_factory=lambda: FileCache("continue_watching")
+    )
+    lock: RLock = field(init=False, default_factory=RLock)
+
+    @staticmethod
+    def _build_entry(meta: StremioMeta, progress: bool, notify: bool) -> dict:
+        aired = [v for v in meta.videos if v.aired]
+        meta_dict = meta.as_dict()
+        meta_dict["videos"] = []
+        return {
+            "meta": meta_dict,
+            "progress": progress,
+            "notify": notify,
+            "default_video": bool(
+                meta.behaviorHints and meta.behaviorHints.defaultVideoId
+            ),
+            "latest_aired": _timestamp(max((v.released for v in aired), default=None)),
+            "latest_episode": _timestamp(
+                max((v.released for v in aired if v.season), default=None)
+            ),
+        }
+
+    @staticmethod
+    def _is_visible(item: StremioLibrary | None, entry: dict) -> bool:
+        if item is None or item.mtime is None:
+            return False
+        if _in_progress(item):
+            return True
+
+        last_watched = _timestamp(item.state.lastWatched)
+        return (
+            entry["notify"]
+            and is_notifiable(item)
+            and not entry["default_video"]
+            and entry["latest_episode"] is not None
+            and (last_watched is None or last_watched < entry["latest_episode"])
+        )
+
+    @staticmethod
+    def _fetch_metas(items: list[StremioLibrary]) -> list[StremioMeta]:
+        from apis.StremioAPI import stremio_api
+
+        def _library_to_meta(l: StremioLibrary):
+            return stremio_api.get_metadata_by_id(l.id, l.type)
+
+        return [m for m in thread_function(_library_to_meta, items) if m]
+
+    def _set_progress(self, metas: list[StremioMeta], write=True):
+        with self.lock:
+            changed = False
+            for meta in metas:
+                entry = self.cache.get(meta.id)
+                notify = (entry or {}).get("notify", False)
+                if (new_entry := self._build_entry(meta, True, notify)) != entry:
+                    self.cache.set(meta.id, new_entry, write=False)
+                    changed = True
+            if changed and write:
+                self.cache.write()
+
+    def _add_progress(self, items: list[StremioLibrary]):
+        self._set_progress(self._fetch_metas(items))
+
+    def update(self, items: list[StremioLibrary]):
+        missing = []
+        with self.lock:
+            changed = False
+            for item in items:
+                entry = self.cache.get(item.id)
+                if _in_progress(item):
+                    if not entry or not entry["progress"]:
+                        missing.append(item)
+                elif entry and not (entry["notify"] and is_notifiable(item)):
+                    self.cache.delete(item.id, write=False)
+                    changed = True
+            if changed:
+                self.cache.write()
+
+        if missing:
+            Thread(target=self._add_progress, args=(missing,)).start()
+
+    def update_notifications(self, metas: list[StremioMeta], replace=True, write=True):
+        with self.lock:
+            changed = False
+            notified_ids = {m.id for m in metas}
+            if replace:
+                for key in self.cache.keys():
+                    entry = self.cache.get(key)
+                    if key in notified_ids or not entry["notify"]:
+                        continue
+                    if entry["progress"]:
+                        entry["notify"] = False
+                        self.cache.set(key, entry, write=False)
+                    else:
+                        self.cache.delete(key, write=False)
+                    changed = True
+
+            for meta in metas:
+                entry = self.cache.get(meta.id)
+                if entry and entry["progress"]:
+                    if entry["notify"]:
+                        continue
+                    entry["notify"] = True
+                    self.cache.set(meta.id, entry, write=False)
+                elif (new_entry := self._build_entry(meta, False, True)) != entry:
+                    self.cache.set(meta.id, new_entry, write=False)
+                else:
+                    continue
+                changed = True
+            if changed and write:
+                self.cache.write()
+
+    def refresh(self):
+        from apis.StremioAPI import stremio_api
+
+        data_store = stremio_api.get_data_store()
+        progress_items = [v for v in data_store.values() if _in_progress(v)]
+        notif_items = [
+            v for v in data_store.values() if is_notifiable(v) and not _in_progress(v)
+        ]
+
+        metas = self._fetch_metas(progress_items)
+        candidates = notifications.get_candidates(notif_items)
+        with self.lock:
+            self.cache.clear(write=False)
+            self._set_progress(metas, write=False)
+            self.update_notifications(candidates, write=False)
+            self.cache.write()
+
+    def refresh_notifications(self):
+        from apis.StremioAPI import stremio_api
+
+        self.update_notifications(
+            notifications.get_candidates(
+                [
+                    v
+                    for v in stremio_api.get_data_store().values()
+                    if is_notifiable(v) and not _in_progress(v)
+                ]
+            )
+        )
+
+    def get(self) -> list[StremioMeta]:
+        from apis.StremioAPI import stremio_api
+
+        if not self.cache.exists:
+            self.refresh()
+
+        data_store = stremio_api.get_data_store()
+        missing = [
+            v
+            for k, v in data_store.items()
+            if _in_progress(v) and not (self.cache.get(k) or {}).get("progress")
+        ]
+        if missing:
+            self._add_progress(missing)
+
+        rows = []
+        for key in self.cache.keys():
+            entry = self.cache.get(key)
+            item = data_store.get(key)
+            if not self._is_visible(item, entry):
+                continue
+            rows.append(
+                (max(entry["latest_aired"] or 0, item.mtime.timestamp()), entry)
+            )
+        rows.sort(key=lambda e: e[0], reverse=True)
+
+        return [StremioMeta(**entry["meta"]) for _, entry in rows]
+
+
+continue_watching = ContinueWatching()
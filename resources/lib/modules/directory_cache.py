@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable
+
+from modules.versions import DataVersion, get_versions
+
+DIRECTORY_CACHE_SIZE = 50
+DIRECTORY_CACHE_TTL = 600
+
+
+@dataclass
+class DirectoryCache:
+    entries: OrderedDict[str, tuple[tuple[str, ...], float, Any]] = field(
+        init=False, default_factory=OrderedDict
+    )
+    lock: Lock = field(init=False, default_factory=Lock)
+
+    def get(
+        self,
+        key: str,
+        versions: list[DataVersion],
+        builder: Callable[[bool], Any],
+    ) -> Any:
+        current = get_versions(versions)
+        with self.lock:
+            entry = self.entries.get(key)
+            if (
+                entry
+                and entry[0] == current
+                and time.time() - entry[1] < DIRECTORY_CACHE_TTL
+            ):
+                self.entries.move_to_end(key)
+                return entry[2]
+
+        data = builder(entry is not None)
+        with self.lock:
+            self.entries[key] = (current, time.time(), data)
+            self.entries.move_to_end(key)
+            while len(self.entries) > DIRECTORY_CACHE_SIZE:
+                self.entries.popitem(last=False)
+        return data
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+directory_cache = DirectoryCache()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from threading import RLock
+
+from classes.StremioAddon import Catalog
+from classes.StremioLibrary import StremioLibrary
+from classes.StremioMeta import StremioMeta, StremioType
+from modules.cache import FileCache
+from modules.utils import get_setting, thread_function
+from modules.versions import DataVersion, bump_version
+
+
+def is_notifiable(item: StremioLibrary) -> bool:
+    return (
+        not item.state.noNotif
+        and item.type not in [StremioType.OTHER, StremioType.MOVIE]
+        and not item.removed
+        and not item.temp
+    )
+
+
+def _catalog_key(catalog: Catalog) -> str:
+    return f"{catalog.addon.base_url}/{catalog.type}/{catalog.id}"
+
+
+@dataclass
+class Notifications:
+    cache: FileCache = field(
+        init=False, default_factory=lambda: FileCache("notifications")
+    )
+    lock: RLock = field(init=False, default_factory=RLock)
+
+    @property
+    def ttl(self) -> float:
+        return (get_setting("service.notification_ttl") or 6) * 3600
+
+    def refresh(self, force=False):
+        from apis.StremioAPI import stremio_api
+
+        items = [v for v in stremio_api.get_data_store().values() if is_notifiable(v)]
+
+        def _refresh_catalog(catalog: Catalog):
+            key = _catalog_key(catalog)
+            ids = [
+                i
+                for i in stremio_api.get_notification_ids(catalog, items)
+                if force or self.cache.get(f"{key}|{i}", self.ttl, False) is False
+            ]
+            if not ids:
+                return []
+
+            return [
+                (f"{key}|{i}", meta.as_dict() if meta else None)
+                for i, meta in stremio_api.get_notification_catalog(
+                    catalog, ids
+                ).items()
+            ]
+
+        updates = thread_function(_refresh_catalog, stremio_api.notification_catalogs)
+
+        with self.lock:
+            changed = False
+            for catalog_updates in updates:
+                for key, meta in catalog_updates:
+                    changed |= self.cache.get(key, default=False) != meta
+                    self.cache.set(key, meta, write=False)
+
+            library_ids = {i.id for i in items}
+            for key in self.cache.keys():
+                if key.rsplit("|", 1)[-1] not in library_ids:
+                    self.cache.delete(key, write=False)
+            self.cache.write()
+
+        if changed:
+            bump_version(DataVersion.METADATA)
+
+    def get_candidates(self, library_items: list[StremioLibrary]) -> list[StremioMeta]:
+        from apis.StremioAPI import stremio_api
+
+        if not self.cache.exists:
+            self.refresh()
+
+        candidates: dict[str, StremioMeta] = {}
+        for catalog in stremio_api.notification_catalogs:
+            key = _catalog_key(catalog)
+            for i in stremio_api.get_notification_ids(catalog, library_items):
+                if i not in candidates and (meta := self.cache.get(f"{key}|{i}")):
+                    candidates[i] = StremioMeta(**meta)
+        return list(candidates.values())
+
+
+notifications = Notifications()
@@ -12,11 +12,12 @@ from classes.StremioMeta import StremioMeta, StremioType
 from modules.utils import (
     hide_busy_dialog,
     close_all_dialog,
+    get_setting,
     notification,
     log,
-    run_plugin,
     KodiContentType,
 )
+from modules.progress import ProgressPipeline
 
 
 @dataclass
@@ -30,6 +31,7 @@ class NASPlayerState:
     playback_speed: int = field(default=1, init=False)
     paused: bool = field(default=False, init=False)
     stopped: bool = field(default=False, init=False)
+    prefetched: bool = field(default=False, init=False)
 
 
 def run_error():
@@ -40,7 +42,13 @@ def kill_dialog():
     close_all_dialog()
 
 
-def make_listing(url, resume_point, meta: StremioMeta, episode: int | None):
+def make_listing(
+    url,
+    resume_point,
+    meta: StremioMeta,
+    episode: int | None,
+    subtitles: list[str] | None = None,
+):
     list_item: ListItem
     list_item = (
         meta.videos[episode].build_list_item()
@@ -53,6 +61,8 @@ def make_listing(url, resume_point, meta: StremioMeta, episode: int | None):
     list_item.setPath(url)
     list_item.setProperty("IsPlayable", "true")
     list_item.setProperty("StartOffset", str(resume_point / 1000))
+    if subtitles:
+        list_item.setSubtitles(subtitles)
     return list_item
 
 
@@ -64,6 +74,7 @@ def playback_close_dialogs():
 @dataclass
 class NASPlayer(xbmc.Player):
     state: NASPlayerState | None = field(init=False, default=None)
+    progress: ProgressPipeline = field(init=False, default_factory=ProgressPipeline)
 
     def run(
         self,
@@ -71,10 +82,11 @@ class NASPlayer(xbmc.Player):
         resume_point,
         meta: StremioMeta,
         episode: int | None,
+        subtitles: list[str] | None = None,
     ):
         hide_busy_dialog()
         try:
-            self.play(url, make_listing(url, resume_point, meta, episode))
+            self.play(url, make_listing(url, resume_point, meta, episode, subtitles))
         except Exception as e:
             log(str(e))
             run_error()
@@ -116,23 +128,47 @@ class NASPlayer(xbmc.Player):
         if curr_time >= self.state.total_time and not (stopped or finished):
             return
 
-        update_args = {
-            "mode": "library",
-            "func": "player_update",
-            "content_id": self.state.stremio_id,
-            "video_id": self.state.stremio_video_id,
-            "content_type": self.state.stremio_type,
-            "curr_time": round(curr_time * 1000),
-            "total_time": round(self.state.total_time * 1000),
-            "playing": not self.state.paused,
-            "start_stop": start_stop,
-        }
+        self.progress.put(
+            {
+                "content_id": self.state.stremio_id,
+                "video_id": self.state.stremio_video_id,
+                "content_type": self.state.stremio_type,
+                "curr_time": round(curr_time * 1000),
+                "total_time": round(self.state.total_time * 1000),
+                "playing": not self.state.paused,
+                "start_stop": start_stop,
+            }
+        )
+        hide_busy_dialog()
 
+    def check_prefetch(self):
+        if (
+            not self.state
+            or self.state.prefetched
+            or self.state.stremio_type != StremioType.SERIES
+            or not get_setting("playback.prefetch_next_episode")
+            or not self.isPlayingVideo()
+        ):
+            return
+
+        fraction = (get_setting("playback.prefetch_percentage") or 80) / 100
+        try:
+            if self.getTime() < self.state.total_time * fraction:
+                return
+        except RuntimeError:
+            return
+
+        from modules.stream_cache import prefetch_next_episode
+
+        self.state.prefetched = True
         Thread(
-            target=run_plugin,
-            args=(update_args, False),
+            target=prefetch_next_episode,
+            args=(
+                self.state.stremio_id,
+                self.state.stremio_type,
+                self.state.stremio_video_id,
+            ),
         ).start()
-        hide_busy_dialog()
 
     def onAVStarted(self):
         item: ListItem = self.getPlayingItem()
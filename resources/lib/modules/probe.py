@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable
+
+import requests
+import xbmc
+
+from classes.StremioStream import StremioStream
+from modules.utils import get_setting, log
+
+PROBE_COUNT = 10
+PROBE_TIMEOUT = 5
+PROBE_WORKERS = 6
+
+
+@dataclass
+class ProbeResult:
+    reachable: bool
+    ttfb: float | None = field(default=None)
+
+    @property
+    def label(self) -> str:
+        if not self.reachable:
+            return "Unreachable"
+        return f"{self.ttfb * 1000:.0f} ms"
+
+
+def probe_enabled() -> bool:
+    return bool(get_setting("sources.probe_streams"))
+
+
+def probe_count() -> int:
+    count = get_setting("sources.probe_count")
+    return count if isinstance(count, int) else PROBE_COUNT
+
+
+@dataclass
+class StreamProber:
+    session: requests.Session = field(init=False, default_factory=requests.Session)
+    results: dict[str, ProbeResult] = field(init=False, default_factory=dict)
+    pending: set[str] = field(init=False, default_factory=set)
+    lock: Lock = field(init=False, default_factory=Lock)
+    executor: ThreadPoolExecutor = field(
+        init=False, default_factory=lambda: ThreadPoolExecutor(PROBE_WORKERS)
+    )
+
+    def get(self, stream: StremioStream) -> ProbeResult | None:
+        return self.results.get(stream.url) if stream.url else None
+
+    def probe(self, url: str) -> ProbeResult:
+        started = time.time()
+        try:
+            response = self.session.get(
+                url,
+                headers={"Range": "bytes=0-0"},
+                stream=True,
+                allow_redirects=True,
+                timeout=PROBE_TIMEOUT,
+            )
+            ttfb = time.time() - started
+            response.close()
+            result = ProbeResult(response.status_code < 400, ttfb)
+        except Exception as e:
+            log(f"Probe failed for {url}: {e}", xbmc.LOGDEBUG)
+            result = ProbeResult(False)
+
+        with self.lock:
+            self.results[url] = result
+            self.pending.discard(url)
+        return result
+
+    def submit(
+        self,
+        streams: list[StremioStream],
+        callback: Callable[[StremioStream, ProbeResult], None],
+    ):
+        def _probe(stream: StremioStream):
+            callback(stream, self.probe(stream.url))
+
+        with self.lock:
+            streams = [
+                s
+                for s in streams
+                if s.url
+                and s.url.startswith("http")
+                and s.url not in self.results
+                and s.url not in self.pending
+            ]
+            self.pending.update(s.url for s in streams)
+        for stream in streams:
+            self.executor.submit(_probe, stream)
+
+    def check(self, stream: StremioStream) -> bool:
+        if not stream.url or not stream.url.startswith("http"):
+            return True
+        result = self.get(stream) or self.probe(stream.url)
+        return result.reachable
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
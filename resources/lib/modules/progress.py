@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from queue import Empty, Queue
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Any
+
+import xbmc
+
+from modules.utils import log
+
+if TYPE_CHECKING:
+    from classes.StremioLibrary import StremioLibrary
+
+PROGRESS_FLUSH_INTERVAL = 30
+PROGRESS_IDLE_TIMEOUT = 10
+
+
+@dataclass
+class ProgressPipeline:
+    events: Queue[dict[str, Any]] = field(init=False, default_factory=Queue)
+    pending: dict[str, tuple[StremioLibrary, dict]] = field(
+        init=False, default_factory=dict
+    )
+    dirty_since: float | None = field(init=False, default=None)
+    worker: Thread | None = field(init=False, default=None)
+    lock: Lock = field(init=False, default_factory=Lock)
+
+    def put(self, event: dict[str, Any]):
+        self.events.put(event)
+        with self.lock:
+            if not self.worker or not self.worker.is_alive():
+                self.worker = Thread(target=self._run)
+                self.worker.start()
+
+    def _timeout(self) -> float:
+        if self.dirty_since is None:
+            return PROGRESS_IDLE_TIMEOUT
+        return max(PROGRESS_FLUSH_INTERVAL - (time.time() - self.dirty_since), 0)
+
+    def _run(self):
+        while True:
+            try:
+                event = self.events.get(timeout=self._timeout())
+            except Empty:
+                if not self.pending:
+                    with self.lock:
+                        if self.events.empty():
+                            self.worker = None
+                            return
+                    continue
+                self.flush()
+                continue
+
+            try:
+                self._apply(event)
+            except Exception as e:
+                log(str(e), xbmc.LOGERROR)
+                continue
+
+            if event["start_stop"]:
+                self.flush(send_events=True)
+            elif not self._timeout():
+                self.flush()
+
+    def _apply(self, event: dict[str, Any]):
+        from modules.library import apply_player_update
+
+        library_item, trakt_event = apply_player_update(**event)
+        self.pending[library_item.id] = (library_item, trakt_event)
+        if self.dirty_since is None:
+            self.dirty_since = time.time()
+
+    def flush(self, send_events=False):
+        from modules.sync import event_buffer
+
+        pending, self.pending = self.pending, {}
+        self.dirty_since = None
+        if not pending:
+            return
+
+        for library_item, _ in pending.values():
+            library_item.push()
+        event_buffer.put(
+            [trakt_event for _, trakt_event in pending.values()], send=send_events
+        )
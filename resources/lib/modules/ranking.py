@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import math
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from threading import RLock
+from urllib.parse import urlsplit, urlunsplit
+
+from classes.StremioStream import StremioStream
+from modules.utils import get_setting
+
+RESOLUTION_PATTERN = re.compile(
+    r"\b(2160p|4k|uhd|1440p|1080p|fhd|720p|hd|576p|480p|sd)\b", re.I
+)
+RESOLUTIONS = {
+    "2160p": 2160,
+    "4k": 2160,
+    "uhd": 2160,
+    "1440p": 1440,
+    "1080p": 1080,
+    "fhd": 1080,
+    "720p": 720,
+    "hd": 720,
+    "576p": 576,
+    "480p": 480,
+    "sd": 480,
+}
+CODEC_PATTERNS = [
+    ("av1", re.compile(r"\bav1\b", re.I)),
+    ("hevc", re.compile(r"\b(hevc|[xh]\.?265)\b", re.I)),
+    ("h264", re.compile(r"\b(avc|[xh]\.?264)\b", re.I)),
+]
+CODEC_SCORES = {"av1": 1.0, "hevc": 0.8, "h264": 0.5}
+HDR_PATTERN = re.compile(r"\b(hdr(10)?\+?|dv|dovi|dolby\s?vision)\b", re.I)
+SIZE_PATTERN = re.compile(r"(\d+(?:[.,]\d+)?)\s*(tb|gb|mb)\b", re.I)
+SIZE_UNITS = {"tb": 1024**4, "gb": 1024**3, "mb": 1024**2}
+SEEDERS_PATTERN = re.compile(r"(?:👤|seeders?:?)\s*(\d+)", re.I)
+MAX_SCORED_SIZE = 80 * 1024**3
+
+
+@dataclass
+class StreamFeatures:
+    resolution: int = field(default=0)
+    codec: str | None = field(default=None)
+    hdr: bool = field(default=False)
+    size: int = field(default=0)
+    seeders: int = field(default=0)
+
+    @property
+    def resolution_label(self) -> str | None:
+        return f"{self.resolution}p" if self.resolution else None
+
+    @property
+    def label(self) -> str:
+        parts = [
+            "4K" if self.resolution == 2160 else self.resolution_label,
+            "HDR" if self.hdr else None,
+            self.codec.upper() if self.codec else None,
+            f"{self.size / 1024 ** 3:.1f} GB" if self.size else None,
+        ]
+        return " • ".join(p for p in parts if p)
+
+
+def parse_stream(stream: StremioStream) -> StreamFeatures:
+    text = f"{stream.name or ''} {stream.description or ''}"
+    if stream.behaviorHints.filename:
+        text = f"{text} {stream.behaviorHints.filename}"
+    features = StreamFeatures()
+
+    if match := RESOLUTION_PATTERN.search(text):
+        features.resolution = RESOLUTIONS[match.group(1).lower()]
+    features.codec = next((c for c, p in CODEC_PATTERNS if p.search(text)), None)
+    features.hdr = bool(HDR_PATTERN.search(text))
+
+    if stream.behaviorHints.videoSize:
+        features.size = int(stream.behaviorHints.videoSize)
+    elif match := SIZE_PATTERN.search(text):
+        value = float(match.group(1).replace(",", "."))
+        features.size = int(value * SIZE_UNITS[match.group(2).lower()])
+
+    if match := SEEDERS_PATTERN.search(text):
+        features.seeders = int(match.group(1))
+    return features
+
+
+@dataclass
+class RankingWeights:
+    resolution: float = field(default=5)
+    hdr: float = field(default=2)
+    codec: float = field(default=1)
+    size: float = field(default=2)
+    seeders: float = field(default=1)
+
+    @classmethod
+    def from_settings(cls) -> RankingWeights:
+        weights = cls()
+        for name in ["resolution", "hdr", "codec", "size", "seeders"]:
+            value = get_setting(f"sources.weight_{name}")
+            if isinstance(value, (int, float)):
+                setattr(weights, name, value)
+        return weights
+
+    def score(self, features: StreamFeatures) -> float:
+        return (
+            self.resolution * features.resolution / 2160
+            + self.hdr * features.hdr
+            + self.codec * CODEC_SCORES.get(features.codec, 0)
+            + self.size * min(features.size / MAX_SCORED_SIZE, 1)
+            + self.seeders * min(math.log10(features.seeders + 1) / 3, 1)
+        )
+
+
+def stream_identities(stream: StremioStream) -> list[str]:
+    identities = []
+    if stream.infoHash:
+        identities.append(f"hash:{stream.infoHash.lower()}:{stream.fileIdx}")
+    if stream.url:
+        parts = urlsplit(stream.url)
+        identities.append(
+            "url:"
+            + urlunsplit(
+                (
+                    parts.scheme.lower(),
+                    parts.netloc.lower(),
+                    parts.path.rstrip("/"),
+                    parts.query,
+                    "",
+                )
+            )
+        )
+    hints = stream.behaviorHints
+    if hints.filename and hints.videoSize:
+        identities.append(f"file:{hints.filename.lower()}:{hints.videoSize}")
+    return identities
+
+
+@dataclass
+class RankedStreams:
+    weights: RankingWeights = field(default_factory=RankingWeights.from_settings)
+    keys: list[tuple[float, int, int]] = field(init=False, default_factory=list)
+    streams: list[StremioStream] = field(init=False, default_factory=list)
+    features: dict[tuple[int, int], StreamFeatures] = field(
+        init=False, default_factory=dict
+    )
+    identities: dict[str, tuple[float, int, int]] = field(
+        init=False, default_factory=dict
+    )
+    lock: RLock = field(init=False, default_factory=RLock)
+
+    def __len__(self):
+        return len(self.streams)
+
+    def _remove(self, key: tuple[float, int, int]) -> StremioStream:
+        position = bisect_left(self.keys, key)
+        del self.keys[position]
+        return self.streams.pop(position)
+
+    def _add(self, key: tuple[float, int, int], stream: StremioStream):
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.streams.insert(position, stream)
+
+    def insert(self, streams: list[StremioStream], addon_idx: int):
+        with self.lock:
+            self._insert(streams, addon_idx)
+
+    def _insert(self, streams: list[StremioStream], addon_idx: int):
+        batch = []
+        for stream_idx, stream in enumerate(streams):
+            features = parse_stream(stream)
+            self.features[(addon_idx, stream_idx)] = features
+            batch.append(
+                ((-self.weights.score(features), addon_idx, stream_idx), stream)
+            )
+        batch.sort(key=lambda e: e[0])
+
+        for key, stream in batch:
+            identities = stream_identities(stream)
+            matched = sorted(
+                {self.identities[i] for i in identities if i in self.identities}
+            )
+
+            if not matched:
+                self._add(key, stream)
+                merged = []
+            elif matched[0] <= key:
+                kept = self.streams[bisect_left(self.keys, matched[0])]
+                kept.also_from.append(stream.addon_name)
+                key, merged = matched[0], matched[1:]
+            else:
+                kept = stream
+                merged = matched
+                self._add(key, stream)
+
+            for merged_key in merged:
+                replaced = self._remove(merged_key)
+                kept.also_from.extend([replaced.addon_name, *replaced.also_from])
+            if merged:
+                merged = set(merged)
+                for i, k in self.identities.items():
+                    if k in merged:
+                        self.identities[i] = key
+            for i in identities:
+                self.identities[i] = key
+
+    def demote(self, stream: StremioStream):
+        with self.lock:
+            identities = stream_identities(stream)
+            key = next(
+                (self.identities[i] for i in identities if i in self.identities), None
+            )
+            if key is None or key[0] == math.inf:
+                return
+            kept = self._remove(key)
+            demoted_key = (math.inf, key[1], key[2])
+            self._add(demoted_key, kept)
+            for i, k in list(self.identities.items()):
+                if k == key:
+                    self.identities[i] = demoted_key
+
+    def resolve(self, stream: StremioStream) -> tuple[int, int] | None:
+        with self.lock:
+            for identity in stream_identities(stream):
+                if (key := self.identities.get(identity)) is not None:
+                    return key[1], key[2]
+            return None
+
+    def order(self) -> list[tuple[int, int]]:
+        with self.lock:
+            return [(k[1], k[2]) for k in self.keys]
+
+    def ordered_streams(self) -> list[StremioStream]:
+        with self.lock:
+            return list(self.streams)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from itertools import chain
+from threading import Event, Lock, Thread
+
+import xbmc
+
+from classes.StremioAddon import ExtraType
+from classes.StremioMeta import StremioMeta
+from modules.cache import FileCache
+from modules.catalog_pages import catalog_pages
+from modules.utils import classes_from_list, log
+
+SEARCH_CACHE_TTL = 900
+SEARCH_DEADLINE = 6
+SEARCH_ENOUGH_RESULTS = 100
+
+
+def merge_results(
+    pages: list[list[StremioMeta] | None], ordered=False
+) -> list[StremioMeta]:
+    merged = []
+    seen = set()
+    pages = [p for p in pages if p]
+    if ordered:
+        for meta in chain(*pages):
+            if meta.id not in seen:
+                seen.add(meta.id)
+                merged.append(meta)
+        return merged
+    for rank in range(max((len(p) for p in pages), default=0)):
+        for page in pages:
+            if rank < len(page) and (meta := page[rank]).id not in seen:
+                seen.add(meta.id)
+                merged.append(meta)
+    return merged
+
+
+def local_results(query: str) -> list[StremioMeta]:
+    from apis.StremioAPI import stremio_api
+    from modules.search_index import search_index
+
+    return [
+        stremio_api.metadata.get(doc["id"])
+        or StremioMeta(
+            id=doc["id"], type=doc["type"], name=doc["name"], poster=doc["poster"]
+        )
+        for doc in search_index.search(query)
+    ]
+
+
+@dataclass
+class UnifiedSearch:
+    cache: FileCache = field(init=False, default_factory=lambda: FileCache("search"))
+    lock: Lock = field(init=False, default_factory=Lock)
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def _store(self, key: str, results: list[StremioMeta]):
+        with self.cache.lock:
+            now = time.time()
+            for k in self.cache.keys():
+                if now - self.cache.entries[k]["time"] > SEARCH_CACHE_TTL:
+                    self.cache.delete(k, write=False)
+            self.cache.set(key, [m.as_dict() for m in results])
+
+    def is_complete(self, query: str) -> bool:
+        return self.cache.get(self._key(query), SEARCH_CACHE_TTL) is not None
+
+    def search(self, query: str) -> list[StremioMeta]:
+        local = local_results(query)
+        return merge_results([local, self._remote(query)], ordered=True)
+
+    def _remote(self, query: str) -> list[StremioMeta]:
+        from apis.StremioAPI import stremio_api
+
+        key = self._key(query)
+        if (cached := self.cache.get(key, SEARCH_CACHE_TTL)) is not None:
+            return classes_from_list(StremioMeta, cached)
+
+        catalogs = stremio_api.search_catalogs
+        pages: list[list[StremioMeta] | None] = [None for _ in catalogs]
+        ready = Event()
+
+        failed = []
+
+        def _search(idx: int):
+            try:
+                page = catalog_pages.get(catalogs[idx], ExtraType.SEARCH, query)
+            except Exception as e:
+                log(f"Search failed for {catalogs[idx].title}: {e}", xbmc.LOGERROR)
+                page = None
+            if page is None:
+                failed.append(idx)
+                page = []
+
+            with self.lock:
+                pages[idx] = page
+                finished = all(p is not None for p in pages)
+                if finished or sum(len(p or []) for p in pages) >= (
+                    SEARCH_ENOUGH_RESULTS
+                ):
+                    ready.set()
+            if finished and not failed:
+                self._store(key, merge_results(pages))
+
+        for idx in range(len(catalogs)):
+            Thread(target=_search, args=(idx,)).start()
+        if catalogs:
+            ready.wait(SEARCH_DEADLINE)
+        return merge_results(list(pages))
+
+
+unified_search = UnifiedSearch()
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from threading import RLock, Timer
+from typing import TYPE_CHECKING
+
+from modules.cache import FileCache
+
+if TYPE_CHECKING:
+    from classes.StremioLibrary import StremioLibrary
+    from classes.StremioMeta import StremioMeta
+
+TOKEN_PATTERN = re.compile(r"\w+")
+NAME_WEIGHT = 3
+FIELD_WEIGHT = 1
+SEARCH_INDEX_MAX_METAS = 5000
+SEARCH_INDEX_LIMIT = 50
+SEARCH_INDEX_WRITE_DELAY = 2
+
+
+def tokenize(text: str | None) -> list[str]:
+    if not text:
+        return []
+    text = text.lower()
+    if not text.isascii():
+        text = "".join(
+            c
+            for c in unicodedata.normalize("NFKD", text)
+            if not unicodedata.combining(c)
+        )
+    return TOKEN_PATTERN.findall(text)
+
+
+def _meta_doc(meta: StremioMeta) -> dict:
+    return {
+        "id": meta.id,
+        "type": meta.type,
+        "name": meta.name,
+        "poster": meta.poster,
+        "text": " ".join([*meta.genres, *meta.cast, *meta.director]),
+    }
+
+
+@dataclass
+class SearchIndex:
+    cache: FileCache = field(
+        init=False, default_factory=lambda: FileCache("search_index")
+    )
+    docs: dict[str, dict] = field(init=False, default_factory=dict)
+    library: set[str] = field(init=False, default_factory=set)
+    postings: dict[str, dict[str, int]] = field(init=False, default_factory=dict)
+    doc_tokens: dict[str, dict[str, int]] = field(init=False, default_factory=dict)
+    sorted_tokens: list[str] | None = field(init=False, default=None)
+    loaded: bool = field(init=False, default=False)
+    lock: RLock = field(init=False, default_factory=RLock)
+    write_timer: Timer | None = field(init=False, default=None)
+
+    def _index(self, doc: dict):
+        doc_id = doc["id"]
+        self._unindex(doc_id)
+        tokens = {t: FIELD_WEIGHT for t in tokenize(doc.get("text"))}
+        tokens.update({t: NAME_WEIGHT for t in tokenize(doc["name"])})
+        self.docs[doc_id] = doc
+        self.doc_tokens[doc_id] = tokens
+        for token, weight in tokens.items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                self.sorted_tokens = None
+            self.postings[token][doc_id] = weight
+
+    def _unindex(self, doc_id: str):
+        for token in self.doc_tokens.pop(doc_id, {}):
+            posting = self.postings[token]
+            posting.pop(doc_id, None)
+            if not posting:
+                del self.postings[token]
+                self.sorted_tokens = None
+        self.docs.pop(doc_id, None)
+
+    def _library_doc(self, item: StremioLibrary) -> dict:
+        doc = self.docs.get(item.id) or {}
+        return {
+            "id": item.id,
+            "type": item.type,
+            "name": item.name,
+            "poster": item.poster or doc.get("poster"),
+            "text": doc.get("text", ""),
+        }
+
+    def ensure_loaded(self):
+        from apis.StremioAPI import stremio_api
+
+        with self.lock:
+            if self.loaded:
+                return
+            self.cache.load()
+            for entry in self.cache.entries.values():
+                self._index(entry["data"])
+            self.loaded = True
+            self.update_library(stremio_api.get_data_store().values())
+
+    def drop_library(self, ids: list[str]):
+        with self.lock:
+            if not self.loaded:
+                return
+            for item_id in ids:
+                self.library.discard(item_id)
+                if item_id not in self.cache.entries:
+                    self._unindex(item_id)
+
+    def update_library(self, items):
+        with self.lock:
+            if not self.loaded:
+                return
+            for item in items:
+                if item.removed or item.temp:
+                    self.library.discard(item.id)
+                    if item.id not in self.cache.entries:
+                        self._unindex(item.id)
+                    continue
+                self.library.add(item.id)
+                self._index(self._library_doc(item))
+
+    def add_metas(self, metas: list[StremioMeta]):
+        with self.lock:
+            changed = False
+            for meta in metas:
+                doc = _meta_doc(meta)
+                if self.cache.get(meta.id) == doc:
+                    continue
+                self.cache.set(meta.id, doc, write=False)
+                changed = True
+                if self.loaded:
+                    self._index(doc)
+            if changed and not self.write_timer:
+                self.write_timer = Timer(SEARCH_INDEX_WRITE_DELAY, self.flush)
+                self.write_timer.start()
+
+    def flush(self):
+        with self.lock:
+            self.write_timer = None
+            keys = list(self.cache.entries)
+            if len(keys) > SEARCH_INDEX_MAX_METAS:
+                keys.sort(key=lambda k: self.cache.entries[k]["time"])
+                for key in keys[: len(keys) - SEARCH_INDEX_MAX_METAS]:
+                    self.cache.delete(key, write=False)
+                    if self.loaded and key not in self.library:
+                        self._unindex(key)
+            self.cache.write()
+
+    def _expand(self, token: str) -> list[str]:
+        if self.sorted_tokens is None:
+            self.sorted_tokens = sorted(self.postings)
+        tokens = []
+        for idx in range(
+            bisect_left(self.sorted_tokens, token), len(self.sorted_tokens)
+        ):
+            if not self.sorted_tokens[idx].startswith(token):
+                break
+            tokens.append(self.sorted_tokens[idx])
+        return tokens
+
+    def search(self, query: str, limit: int = SEARCH_INDEX_LIMIT) -> list[dict]:
+        self.ensure_loaded()
+        with self.lock:
+            scores: dict[str, int] | None = None
+            for token in dict.fromkeys(tokenize(query)):
+                matches: dict[str, int] = {}
+                for expanded in self._expand(token):
+                    exact = expanded == token
+                    for doc_id, weight in self.postings[expanded].items():
+                        weight = weight * 2 if exact else weight
+                        if weight > matches.get(doc_id, 0):
+                            matches[doc_id] = weight
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {
+                        doc_id: score + matches[doc_id]
+                        for doc_id, score in scores.items()
+                        if doc_id in matches
+                    }
+                if not scores:
+                    return []
+
+            ranked = sorted(
+                (scores or {}).items(),
+                key=lambda e: (
+                    e[0] not in self.library,
+                    -e[1],
+                    self.docs[e[0]]["name"],
+                ),
+            )
+            return [
+                {**self.docs[doc_id], "library": doc_id in self.library}
+                for doc_id, _ in ranked[:limit]
+            ]
+
+
+search_index = SearchIndex()
@@ -1,21 +1,37 @@
 from __future__ import annotations
 
 import sys
+import time
 from dataclasses import dataclass, field
 from enum import IntEnum, auto
-from threading import Thread
+from threading import Event, Lock, Thread
 from typing import Callable
 
+import xbmc
+from xbmcgui import DialogProgress
 from xbmcplugin import endOfDirectory
 
+from apis.StreamingServerAPI import streaming_server
 from apis.StremioAPI import stremio_api
+from modules.binge import binge_choices
+from modules.probe import StreamProber, probe_enabled
+from modules.ranking import RankedStreams
+from modules.subtitles import SubtitlePrefetch
 from modules.utils import (
+    get_setting,
     hide_busy_dialog,
     log,
+    notification,
 )
 from modules.player import NASPlayer
 from windows.sources import SourcesResults
 
+BINGE_TIMEOUT = 30
+PREBUFFER_SIZE = 20
+PREBUFFER_TIMEOUT = 120
+PREBUFFER_POLL_INTERVAL = 1
+PROBE_FALLBACK_ATTEMPTS = 3
+
 
 class PlayTypes(IntEnum):
     DEFAULT = auto()
@@ -35,6 +51,12 @@ class Sources:
     play_type: PlayTypes | None = PlayTypes.DEFAULT
     meta: StremioMeta = field(init=False)
     results: list[list[StremioStream] | None] | None = field(init=False, default=None)
+    ranked: RankedStreams = field(init=False, default_factory=RankedStreams)
+    prober: StreamProber = field(init=False, default_factory=StreamProber)
+    lock: Lock = field(init=False, default_factory=Lock)
+    generation: int = field(init=False, default=0)
+    fetched: Event = field(init=False, default_factory=Event)
+    fetch_listeners: list[Event] = field(init=False, default_factory=list)
     resume: bool = field(default=False)
     result_listeners: list[
         Callable[[list[list[StremioStream] | None] | None, int], None]
@@ -48,35 +70,92 @@ class Sources:
                 idx for idx, i in enumerate(self.meta.videos) if i.id == self.episode_id
             )
 
+    @property
+    def video_id(self) -> str:
+        if self.episode is not None:
+            return self.meta.videos[self.episode].id
+        return self.meta.behaviorHints.defaultVideoId or self.meta.id
+
     def play(self):
         return self.get_sources()
 
-    def get_sources(self):
-        Thread(
-            target=stremio_api.get_streams_by_id,
-            kwargs={
-                "content_id": (
-                    self.meta.videos[self.episode].id
-                    if self.episode is not None
-                    else self.meta.behaviorHints.defaultVideoId or self.meta.id
-                ),
-                "content_type": self.content_type,
-                "callback": self.process_results,
-            },
-        ).start()
+    def get_sources(self, refresh=False):
+        generation = self.generation
+        fetched = self.fetched = Event()
+
+        def _fetch():
+            try:
+                stremio_api.get_streams_by_id(
+                    self.video_id,
+                    self.content_type,
+                    lambda *args: self.process_results(*args, generation),
+                    refresh,
+                )
+            finally:
+                fetched.set()
+                for e in list(self.fetch_listeners):
+                    e.set()
 
+        Thread(target=_fetch).start()
+
+        if self.play_type == PlayTypes.AUTOPLAY and (
+            selection := self.wait_for_binge_match()
+        ):
+            return self.play_file(self.results, selection)
         return self.display_results()
 
-    def process_results(self, results: list[StremioStream], position, addon_count: int):
-        if not self.results:
-            self.results = [None for _ in range(addon_count)]
-        self.results[position] = [r for r in results if r.url]
-        for l in self.result_listeners:
-            l(self.results, position)
+    def wait_for_binge_match(self) -> StremioStream | None:
+        if self.episode is None or not binge_choices.has_choice(self.meta.id):
+            return None
+
+        done = Event()
+        matches = []
+
+        def _check_results(results, position):
+            if selection := binge_choices.match(self.meta.id, results[position] or []):
+                matches.append(selection)
+                done.set()
+            elif None not in results:
+                done.set()
+
+        self.result_listeners.append(_check_results)
+        self.fetch_listeners.append(done)
+        if self.fetched.is_set():
+            done.set()
+        for idx, r in enumerate(self.results or []):
+            if r is not None:
+                _check_results(self.results, idx)
+        done.wait(BINGE_TIMEOUT)
+        self.result_listeners.remove(_check_results)
+        self.fetch_listeners.remove(done)
+
+        return matches[0] if matches else None
+
+    def process_results(
+        self,
+        results: list[StremioStream],
+        position,
+        addon_count: int,
+        generation: int = 0,
+    ):
+        with self.lock:
+            if generation != self.generation:
+                return
+            if not self.results:
+                self.results = [None for _ in range(addon_count)]
+            torrents = streaming_server.enabled
+            self.results[position] = [
+                r for r in results if r.url or (torrents and r.infoHash)
+            ]
+            self.ranked.insert(self.results[position], position)
+            for l in self.result_listeners:
+                l(self.results, position)
 
     def display_results(self):
         results_window = SourcesResults(
             results=self.results,
+            ranked=self.ranked,
+            prober=self.prober,
             result_listeners=self.result_listeners,
             meta=self.meta,
             episode=self.episode,
@@ -85,24 +164,108 @@ class Sources:
         from classes.StremioStream import StremioStream
 
         selection: StremioStream | None = results_window.run()
+        self.prober.shutdown()
 
+        if results_window.refresh:
+            return self.refresh_sources()
         if selection:
+            if self.episode is not None:
+                binge_choices.remember(self.meta.id, selection)
             return self.play_file(self.results, selection)
         else:
             handle = int(sys.argv[1])
             return endOfDirectory(handle, False)
 
+    def refresh_sources(self):
+        with self.lock:
+            self.generation += 1
+            self.results = None
+            self.ranked = RankedStreams()
+            self.prober = StreamProber()
+        return self.get_sources(refresh=True)
+
+    def first_reachable(self, source: StremioStream) -> StremioStream | None:
+        if not probe_enabled():
+            return source
+
+        candidates = [source] + [
+            s for s in self.ranked.ordered_streams() if s is not source
+        ]
+        for candidate in candidates[:PROBE_FALLBACK_ATTEMPTS]:
+            if self.prober.check(candidate):
+                return candidate
+            log(f"Stream unreachable, trying next: {candidate.url}")
+        return None
+
+    def resolve_url(self, source: StremioStream) -> str | None:
+        if source.url:
+            return source.url
+
+        file_idx = streaming_server.create(source)
+        if file_idx is None:
+            notification("Streaming server could not open the torrent")
+            return None
+        if not self.prebuffer(source.infoHash, file_idx):
+            return None
+        return streaming_server.stream_url(source.infoHash, file_idx)
+
+    @staticmethod
+    def prebuffer(info_hash: str, file_idx: int) -> bool:
+        size = get_setting("sources.prebuffer_size")
+        target = (size if isinstance(size, int) else PREBUFFER_SIZE) * 1024**2
+        monitor = xbmc.Monitor()
+        dialog = DialogProgress()
+        dialog.create("Pre-buffering", "Connecting to peers...")
+        started = time.time()
+        try:
+            while not dialog.iscanceled():
+                stats = streaming_server.stats(info_hash, file_idx)
+                stream_len = stats.get("streamLen") or 0
+                buffered = (stats.get("streamProgress") or 0) * stream_len
+                required = min(target, stream_len) if stream_len else target
+                if stream_len and buffered >= required:
+                    return True
+
+                dialog.update(
+                    int(min(buffered / required, 1) * 100),
+                    f"{buffered / 1024 ** 2:.1f} / {required / 1024 ** 2:.1f} MB"
+                    f" • {stats.get('peers') or 0} peers"
+                    f" • {(stats.get('downloadSpeed') or 0) / 1024 ** 2:.1f} MB/s",
+                )
+                if time.time() - started > PREBUFFER_TIMEOUT:
+                    notification("Pre-buffering timed out")
+                    return False
+                if monitor.waitForAbort(PREBUFFER_POLL_INTERVAL):
+                    return False
+            return False
+        finally:
+            dialog.close()
+
     def play_file(self, results, source: StremioStream):
         try:
             hide_busy_dialog()
             if not source:
                 source = results[0]
             hide_busy_dialog()
+            subtitles = SubtitlePrefetch(
+                self.video_id, self.content_type, source
+            ).start()
+            if not (reachable := self.first_reachable(source)):
+                notification("No reachable stream found")
+                return
+            if reachable is not source:
+                source = reachable
+                subtitles = SubtitlePrefetch(
+                    self.video_id, self.content_type, source
+                ).start()
+            if not (url := self.resolve_url(source)):
+                return
             NASPlayer().run(
-                source.url,
+                url,
                 (self.meta.library.state.timeOffset or 0) if self.resume else 0,
                 meta=self.meta,
                 episode=self.episode,
+                subtitles=subtitles.result(),
             )
         except Exception as e:
             log(f"Error playing file: {e}")
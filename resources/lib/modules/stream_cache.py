@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+
+from classes.StremioAddon import StremioAddon
+from classes.StremioStream import StremioStream
+from modules.cache import FileCache
+from modules.utils import classes_from_list, get_setting, log
+
+STREAM_CACHE_TTL = 30
+
+
+@dataclass
+class StreamCache:
+    cache: FileCache = field(init=False, default_factory=lambda: FileCache("streams"))
+
+    @staticmethod
+    def ttl() -> int:
+        ttl = get_setting("sources.stream_cache_ttl")
+        return (ttl if isinstance(ttl, int) else STREAM_CACHE_TTL) * 60
+
+    @staticmethod
+    def _key(content_type: str, content_id: str, addon: StremioAddon) -> str:
+        return f"{content_type}|{content_id}|{addon.transportUrl}"
+
+    def get(
+        self, content_type: str, content_id: str, addon: StremioAddon
+    ) -> list[StremioStream] | None:
+        if not (ttl := self.ttl()):
+            return None
+        streams = self.cache.get(self._key(content_type, content_id, addon), ttl)
+        if streams is None:
+            return None
+
+        streams = classes_from_list(StremioStream, streams)
+        for s in streams:
+            s.cached = True
+        return streams
+
+    def set(
+        self,
+        content_type: str,
+        content_id: str,
+        addon: StremioAddon,
+        streams: list[StremioStream],
+        write=True,
+    ):
+        if not (ttl := self.ttl()):
+            return
+        with self.cache.lock:
+            now = time.time()
+            for key in self.cache.keys():
+                if now - self.cache.entries[key]["time"] > ttl:
+                    self.cache.delete(key, write=False)
+            self.cache.set(
+                self._key(content_type, content_id, addon),
+                [s.as_dict() for s in streams],
+                write=write,
+            )
+
+    def write(self):
+        if self.ttl():
+            self.cache.write()
+
+
+def prefetch_next_episode(content_id: str, content_type: str, video_id: str):
+    from apis.StremioAPI import stremio_api
+
+    meta = stremio_api.get_metadata_by_id(content_id, content_type)
+    episode = next((v for v in meta.videos if v.id == video_id), None)
+    if not episode or not episode.next_episode:
+        return
+
+    log(f"Prefetching streams for {episode.next_episode.id}")
+    stremio_api.get_streams_by_id(
+        episode.next_episode.id, content_type, lambda *_: None
+    )
+
+
+stream_cache = StreamCache()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import glob
+import hashlib
+import os
+import time
+from dataclasses import dataclass, field
+from threading import Thread
+from urllib.parse import urlsplit
+
+import requests
+import xbmc
+
+from addon import nas_addon
+from classes.StremioStream import StremioStream
+from classes.StremioSubtitle import StremioSubtitle
+from modules.utils import get_setting, log, thread_function
+
+SUBTITLE_CACHE_DIR = "subtitles"
+SUBTITLE_CACHE_MAX_AGE = 7 * 24 * 3600
+SUBTITLES_PER_LANGUAGE = 2
+SUBTITLE_PREFETCH_TIMEOUT = 5
+SUBTITLE_FORMATS = ["srt", "vtt", "ass", "ssa", "sub", "smi"]
+SUBTITLE_SIGNATURES = [(b"WEBVTT", "vtt"), (b"[Script Info]", "ass")]
+
+
+def preferred_languages() -> list[str]:
+    languages = get_setting("playback.subtitle_languages") or ""
+    return [l.strip().lower() for l in str(languages).split(",") if l.strip()]
+
+
+def _cache_dir() -> str:
+    path = nas_addon.get_file_path(SUBTITLE_CACHE_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _prune_cache(path: str):
+    now = time.time()
+    for filename in os.listdir(path):
+        file_path = os.path.join(path, filename)
+        try:
+            if now - os.path.getmtime(file_path) > SUBTITLE_CACHE_MAX_AGE:
+                os.remove(file_path)
+        except OSError:
+            pass
+
+
+def _extension(url: str, content: bytes) -> str:
+    extension = os.path.splitext(urlsplit(url).path)[1].lstrip(".").lower()
+    if extension in SUBTITLE_FORMATS:
+        return extension
+    head = content[:64].lstrip(b"\xef\xbb\xbf \r\n")
+    return next((e for sig, e in SUBTITLE_SIGNATURES if head.startswith(sig)), "srt")
+
+
+def _download(subtitle: StremioSubtitle, path: str) -> str | None:
+    digest = hashlib.sha1(subtitle.url.encode()).hexdigest()[:16]
+    prefix = os.path.join(path, f"{digest}.{subtitle.lang}")
+    for cached in glob.glob(f"{glob.escape(prefix)}.*"):
+        if not cached.endswith(".tmp"):
+            return cached
+    try:
+        response = requests.get(subtitle.url, timeout=10)
+        response.raise_for_status()
+    except Exception as e:
+        log(f"Subtitle download failed: {e}", xbmc.LOGWARNING)
+        return None
+
+    file_path = f"{prefix}.{_extension(subtitle.url, response.content)}"
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(response.content)
+    os.replace(temp_path, file_path)
+    return file_path
+
+
+def _select(subtitles: list[StremioSubtitle], languages: list[str]):
+    selected = []
+    for language in languages:
+        matching = [s for s in subtitles if (s.lang or "").lower() == language]
+        selected.extend(matching[:SUBTITLES_PER_LANGUAGE])
+    return selected
+
+
+@dataclass
+class SubtitlePrefetch:
+    content_id: str
+    content_type: str
+    stream: StremioStream
+    paths: list[str] = field(init=False, default_factory=list)
+    worker: Thread | None = field(init=False, default=None)
+    started: float = field(init=False, default=0)
+
+    def start(self) -> SubtitlePrefetch:
+        if not get_setting("playback.prefetch_subtitles") or not (
+            preferred_languages()
+        ):
+            return self
+        self.started = time.time()
+        self.worker = Thread(target=self._run)
+        self.worker.start()
+        return self
+
+    def _run(self):
+        from apis.StremioAPI import stremio_api
+
+        hints = self.stream.behaviorHints
+        subtitles = self.stream.subtitles + stremio_api.get_subtitles_by_id(
+            self.content_id,
+            self.content_type,
+            hints.filename,
+            hints.videoHash,
+            hints.videoSize,
+        )
+        selected = _select(subtitles, preferred_languages())
+        if not selected:
+            return
+
+        path = _cache_dir()
+        _prune_cache(path)
+        self.paths = [
+            p for p in thread_function(lambda s: _download(s, path), selected) if p
+        ]
+        log(f"Prefetched {len(self.paths)} subtitles for {self.content_id}")
+
+    def result(self) -> list[str]:
+        if self.worker:
+            self.worker.join(
+                max(SUBTITLE_PREFETCH_TIMEOUT - (time.time() - self.started), 0)
+            )
+        return list(self.paths)
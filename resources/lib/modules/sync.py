@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from threading import Lock, RLock, Thread
+from typing import TYPE_CHECKING
+
+from modules.cache import FileCache
+
+if TYPE_CHECKING:
+    from classes.StremioLibrary import StremioLibrary
+
+SYNC_BATCH_SIZE = 50
+SYNC_RETRY_DELAY = 30
+SYNC_MAX_RETRY_DELAY = 3600
+EVENTS_BATCH_SIZE = 100
+
+
+@dataclass
+class SyncQueue:
+    cache: FileCache = field(
+        init=False, default_factory=lambda: FileCache("sync_queue")
+    )
+    lock: RLock = field(init=False, default_factory=RLock)
+    worker: Thread | None = field(init=False, default=None)
+    worker_lock: Lock = field(init=False, default_factory=Lock)
+
+    def put(self, item: StremioLibrary):
+        data = item.as_dict()
+        with self.lock:
+            queued = self.cache.get(item.id)
+            if not queued or (queued["item"]["_mtime"] or "") <= (data["_mtime"] or ""):
+                self.cache.set(item.id, {"item": data, "attempts": 0, "next_try": 0})
+        self.drain_async()
+
+    def get_mtime(self, item_id: str) -> datetime | None:
+        queued = self.cache.get(item_id)
+        if not queued or not queued["item"]["_mtime"]:
+            return None
+        return datetime.fromisoformat(
+            queued["item"]["_mtime"].replace("Z", "+00:00")
+        ).astimezone(timezone.utc)
+
+    def drain_async(self):
+        with self.worker_lock:
+            if self.worker and self.worker.is_alive():
+                return
+            self.worker = Thread(target=self.drain)
+            self.worker.start()
+
+    def drain(self):
+        from apis.StremioAPI import stremio_api
+
+        now = time.time()
+        due = [
+            entry
+            for key in self.cache.keys()
+            if (entry := self.cache.get(key)) and entry["next_try"] <= now
+        ]
+
+        for idx in range(0, len(due), SYNC_BATCH_SIZE):
+            batch = due[idx : idx + SYNC_BATCH_SIZE]
+            success = stremio_api.put_data([e["item"] for e in batch])
+
+            with self.lock:
+                for entry in batch:
+                    item_id = entry["item"]["_id"]
+                    queued = self.cache.get(item_id)
+                    if (
+                        not queued
+                        or queued["item"]["_mtime"] != entry["item"]["_mtime"]
+                    ):
+                        continue
+                    if success:
+                        self.cache.delete(item_id, write=False)
+                    else:
+                        queued["attempts"] += 1
+                        queued["next_try"] = now + min(
+                            SYNC_RETRY_DELAY * 2 ** (queued["attempts"] - 1),
+                            SYNC_MAX_RETRY_DELAY,
+                        )
+                        self.cache.set(item_id, queued, write=False)
+                self.cache.write()
+
+            if not success:
+                break
+
+
+@dataclass
+class EventBuffer:
+    cache: FileCache = field(init=False, default_factory=lambda: FileCache("events"))
+    lock: RLock = field(init=False, default_factory=RLock)
+    worker: Thread | None = field(init=False, default=None)
+    worker_lock: Lock = field(init=False, default_factory=Lock)
+
+    @staticmethod
+    def _event_key(event: dict) -> str:
+        player = event.get("player", {})
+        return player.get("libItemVideoID") or player.get("libItemID") or ""
+
+    def put(self, events: list[dict], send=False):
+        with self.lock:
+            for event in events:
+                self.cache.set(self._event_key(event), event, write=False)
+            self.cache.write()
+        if send:
+            self.flush_async()
+
+    def flush_async(self):
+        with self.worker_lock:
+            if self.worker and self.worker.is_alive():
+                return
+            self.worker = Thread(target=self.flush)
+            self.worker.start()
+
+    def flush(self):
+        from apis.StremioAPI import stremio_api
+
+        keys = self.cache.keys()
+        for idx in range(0, len(keys), EVENTS_BATCH_SIZE):
+            batch = {
+                k: e
+                for k in keys[idx : idx + EVENTS_BATCH_SIZE]
+                if (e := self.cache.get(k))
+            }
+            if not stremio_api.send_events(list(batch.values())):
+                break
+
+            with self.lock:
+                for key, event in batch.items():
+                    if self.cache.get(key) == event:
+                        self.cache.delete(key, write=False)
+                self.cache.write()
+
+
+sync_queue = SyncQueue()
+event_buffer = EventBuffer()
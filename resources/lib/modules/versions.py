@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import time
+from enum import StrEnum
+
+from addon import nas_addon
+from modules.utils import get_property, set_property
+
+
+class DataVersion(StrEnum):
+    DATASTORE = "datastore"
+    ADDONS = "addons"
+    METADATA = "metadata"
+    WIDGETS = "widgets"
+
+
+def _property(version: DataVersion) -> str:
+    return f"{nas_addon.name}.version.{version}"
+
+
+def get_version(version: DataVersion) -> str:
+    return get_property(_property(version)) or ""
+
+
+def get_versions(versions: list[DataVersion]) -> tuple[str, ...]:
+    return tuple(get_version(v) for v in versions)
+
+
+def bump_version(*versions: DataVersion):
+    token = str(time.time_ns())
+    for version in versions:
+        set_property(_property(version), token)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from threading import RLock
+from typing import Callable
+
+from classes.StremioAddon import Catalog
+from classes.StremioMeta import StremioMeta
+from modules.cache import FileCache
+from modules.utils import (
+    classes_from_list,
+    external,
+    get_setting,
+    log,
+    thread_function,
+)
+from modules.versions import DataVersion, bump_version, get_versions
+
+WIDGET_REFRESH_INTERVAL = 30
+CONTINUE_KEY = "continue"
+CONTINUE_VERSIONS = [DataVersion.DATASTORE, DataVersion.METADATA]
+HOME_VERSIONS = [DataVersion.ADDONS]
+
+
+def _home_key(catalog: Catalog) -> str:
+    return f"home|{catalog.addon.transportUrl}|{catalog.type}|{catalog.id}"
+
+
+@dataclass
+class HomeWidgets:
+    cache: FileCache = field(init=False, default_factory=lambda: FileCache("widgets"))
+    lock: RLock = field(init=False, default_factory=RLock)
+    last_refresh: float = field(init=False, default=0)
+
+    @staticmethod
+    def interval() -> int:
+        interval = get_setting("service.widget_interval")
+        return (interval if isinstance(interval, int) else WIDGET_REFRESH_INTERVAL) * 60
+
+    @staticmethod
+    def _versions(key: str) -> list[DataVersion]:
+        return CONTINUE_VERSIONS if key == CONTINUE_KEY else HOME_VERSIONS
+
+    def _is_stale(self, key: str) -> bool:
+        entry = self.cache.get(key)
+        return (
+            entry is None
+            or tuple(entry["versions"]) != get_versions(self._versions(key))
+            or self.cache.age(key) >= self.interval()
+        )
+
+    def _store(
+        self,
+        key: str,
+        versions: tuple[str, ...],
+        name: str | None,
+        metas: list[StremioMeta],
+        write=True,
+    ):
+        self.cache.set(
+            key,
+            {
+                "versions": versions,
+                "name": name,
+                "metas": [m.as_dict() for m in metas],
+            },
+            write=write,
+        )
+
+    def _get(
+        self, key: str, builder: Callable[[], tuple[str | None, list[StremioMeta]]]
+    ) -> tuple[str | None, list[StremioMeta]]:
+        versions = get_versions(self._versions(key))
+        if (entry := self.cache.get(key)) is not None and (
+            external() or tuple(entry["versions"]) == versions
+        ):
+            return entry["name"], classes_from_list(StremioMeta, entry["metas"])
+
+        name, metas = builder()
+        if metas or key == CONTINUE_KEY:
+            self._store(key, versions, name, metas)
+        return name, metas
+
+    def get_continue(self) -> tuple[str | None, list[StremioMeta]]:
+        from modules.library import get_continue_watching
+
+        return self._get(
+            CONTINUE_KEY, lambda: ("Continue watching", get_continue_watching())
+        )
+
+    def get_home(self, idx: int) -> tuple[str | None, list[StremioMeta], int | None]:
+        from apis.StremioAPI import stremio_api
+        from modules.catalog_pages import catalog_pages
+
+        if len(catalogs := stremio_api.home_catalogs) <= idx:
+            return None, [], None
+
+        catalog = catalogs[idx]
+        name, metas = self._get(
+            _home_key(catalog),
+            lambda: (catalog.title, catalog_pages.get(catalog) or []),
+        )
+        return name, metas, len(metas) if metas and catalog.supports_skip else None
+
+    def expire_continue(self):
+        with self.lock:
+            if (entry := self.cache.get(CONTINUE_KEY)) is not None:
+                entry["versions"] = []
+                self.cache.set(CONTINUE_KEY, entry)
+
+    def is_due(self) -> bool:
+        keys = self.cache.keys()
+        return (
+            time.time() - self.last_refresh >= self.interval()
+            or CONTINUE_KEY not in keys
+            or any(self._is_stale(k) for k in keys)
+        )
+
+    def refresh(self):
+        from apis.StremioAPI import stremio_api
+        from modules.library import get_continue_watching
+        from modules.search_index import search_index
+
+        self.last_refresh = time.time()
+        stremio_api.get_data_store()
+        catalogs = stremio_api.home_catalogs
+        changed = False
+
+        if self._is_stale(CONTINUE_KEY):
+            versions = get_versions(CONTINUE_VERSIONS)
+            self._store(
+                CONTINUE_KEY,
+                versions,
+                "Continue watching",
+                get_continue_watching(),
+            )
+            changed = True
+
+        keys = {_home_key(c): c for c in catalogs}
+        stale = [(k, c) for k, c in keys.items() if self._is_stale(k)]
+        if stale:
+            versions = get_versions(HOME_VERSIONS)
+            pages = thread_function(lambda e: stremio_api.get_catalog(e[1]), stale)
+            with self.lock:
+                for (key, catalog), page in zip(stale, pages):
+                    if page:
+                        search_index.add_metas(page)
+                    else:
+                        log(f"Keeping previous widget rows for {key}")
+                        page = classes_from_list(
+                            StremioMeta, (self.cache.get(key) or {}).get("metas", [])
+                        )
+                    self._store(key, versions, catalog.title, page, write=False)
+                self.cache.write()
+            changed = True
+
+        with self.lock:
+            removed = [
+                k for k in self.cache.keys() if k != CONTINUE_KEY and k not in keys
+            ]
+            for key in removed:
+                self.cache.delete(key, write=False)
+            if removed:
+                self.cache.write()
+
+        if changed or removed:
+            bump_version(DataVersion.WIDGETS)
+
+
+home_widgets = HomeWidgets()
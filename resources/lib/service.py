@@ -1,26 +1,115 @@
 from __future__ import annotations
 
+import math
+import time
 from dataclasses import dataclass, field
+from threading import Thread
+from typing import Callable
 
 import xbmc
 import xbmcgui
 
 from modules.utils import (
+    get_setting,
     log,
     kodi_window,
 )
 from modules.player import NASPlayer
+from modules.widgets import home_widgets
+
+SERVICE_TICK = 5
+
+
+@dataclass
+class ServiceTask:
+    func: Callable[[], None]
+    interval: Callable[[], float]
+    last_run: float = field(init=False, default=0)
+    thread: Thread | None = field(init=False, default=None)
+
+    def run_if_due(self):
+        if self.thread and self.thread.is_alive():
+            return
+        now = time.time()
+        if now - self.last_run < self.interval():
+            return
+        self.last_run = now
+        self.thread = Thread(target=self._run)
+        self.thread.start()
+
+    def _run(self):
+        if not get_setting("stremio.token"):
+            return
+        try:
+            self.func()
+        except Exception as e:
+            log(f"{self.func.__name__}: {e}", xbmc.LOGERROR)
+
+
+def refresh_continue_watching():
+    from modules.continue_watching import continue_watching
+
+    continue_watching.refresh()
+    home_widgets.expire_continue()
+
+
+def drain_sync_queue():
+    from modules.sync import sync_queue
+
+    sync_queue.drain()
+
+
+def flush_events():
+    from modules.sync import event_buffer
+
+    event_buffer.flush()
+
+
+def refresh_notifications():
+    from modules.continue_watching import continue_watching
+    from modules.notifications import notifications
+
+    notifications.refresh()
+    continue_watching.refresh_notifications()
+    home_widgets.expire_continue()
+
+
+def refresh_widgets():
+    home_widgets.refresh()
 
 
 @dataclass
 class NASMonitor(xbmc.Monitor):
     window: xbmcgui.Window = field(init=False)
     player: NASPlayer = field(init=False, default_factory=NASPlayer)
+    tasks: list[ServiceTask] = field(init=False, default_factory=list)
 
     def __post_init__(self):
         log("NASMonitor Service Starting")
         self.window = kodi_window()
-        self.waitForAbort()
+        self.tasks = [
+            ServiceTask(
+                refresh_continue_watching,
+                lambda: (get_setting("service.continue_watching_interval") or 15) * 60,
+            ),
+            ServiceTask(drain_sync_queue, lambda: 60),
+            ServiceTask(flush_events, lambda: 120),
+            ServiceTask(
+                refresh_notifications,
+                lambda: (get_setting("service.notification_interval") or 30) * 60,
+            ),
+            ServiceTask(
+                refresh_widgets,
+                lambda: 0 if home_widgets.is_due() else math.inf,
+            ),
+        ]
+
+        while not self.abortRequested():
+            for task in self.tasks:
+                task.run_if_due()
+            self.player.check_prefetch()
+            if self.waitForAbort(SERVICE_TICK):
+                break
         log("NASMonitor Service Finished")
 
 
@@ -59,6 +59,12 @@ class BaseDialog(WindowXMLDialog, Generic[T]):
     def get_list_item(self, control_id):
         return self._call_control_method(control_id, "getSelectedItem")
 
+    def get_list_item_at(self, control_id, index):
+        return self._call_control_method(control_id, "getListItem", index)
+
+    def remove_item(self, control_id, index):
+        self._call_control_method(control_id, "removeItem", index)
+
     def add_items(self, control_id, items):
         self._call_control_method(control_id, "addItems", items)
 
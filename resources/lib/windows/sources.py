@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
-from itertools import chain
+from queue import Queue
+from threading import Lock, Thread
 from typing import Callable
 
 from xbmcgui import ListItem
@@ -8,6 +9,8 @@ from addon import nas_addon
 from classes.StremioMeta import StremioMeta
 from classes.StremioStream import StremioStream
 from indexers.base_indexer import NASListItem
+from modules.probe import ProbeResult, StreamProber, probe_count, probe_enabled
+from modules.ranking import RankedStreams
 from modules.utils import (
     hide_busy_dialog,
     notification,
@@ -20,71 +23,90 @@ class SourcesResults(BaseDialog[StremioStream]):
     meta: StremioMeta = field(default=None)
     episode: int = field(default=None)
     results: list[list[StremioStream] | None] | None = field(default=None)
+    ranked: RankedStreams = field(default_factory=RankedStreams)
+    prober: StreamProber | None = field(default=None)
     result_listeners: list[
         Callable[[list[list[StremioStream] | None] | None, int], None]
     ] = field(default_factory=list)
     window_id: int = field(init=False, default=2002)
-    item_list: list[list[ListItem]] = field(init=False, default_factory=list)
+    properties: dict[tuple[int, int], dict[str, str]] = field(
+        init=False, default_factory=dict
+    )
+    shown: list[tuple[int, int]] = field(init=False, default_factory=list)
+    shown_properties: list[dict[str, str]] = field(init=False, default_factory=list)
+    updates: Queue[list[tuple[int, int]] | None] = field(
+        init=False, default_factory=Queue
+    )
+    dispatcher: Thread | None = field(init=False, default=None)
+    lock: Lock = field(init=False, default_factory=Lock)
+    refresh: bool = field(init=False, default=False)
     xml_filename = "sources_results"
 
     def onInit(self):
-        self.result_listeners.append(self.update_items)
-        self.update_items()
+        self.result_listeners.append(self.queue_update)
+        self.dispatcher = Thread(target=self.dispatch)
+        self.dispatcher.start()
+        if self.results is None:
+            self.setProperty("remaining_sources", "Loading stream addons...")
+        else:
+            self.updates.put(self.ranked.order())
         self.setFocusId(self.window_id)
 
-    def set_item_list(self, position):
-        if (min_len := position + 1) > len(self.item_list):
-            self.item_list.extend(
-                [] for _ in range((len(self.results) or min_len) - len(self.item_list))
-            )
-        self.item_list[position] = self.make_items(position)
-
-    def update_items(self, results=None, position=None):
+    def queue_update(self, results=None, position=None):
         if results:
             self.results = results
-        if self.results is None:
-            self.setProperty(
-                "remaining_sources",
-                "Loading stream addons...",
-            )
-            return
-        if position is None:
-            for idx, r in enumerate(self.results):
-                if r is None or self.item_list:
-                    continue
-                self.set_item_list(idx)
-        else:
-            self.set_item_list(position)
+        self.updates.put(self.ranked.order())
 
-        selected_position = self.get_position(self.window_id)
-        selected_item = self.get_list_item(self.window_id)
-        self.reset_window(self.window_id)
-        chain_list = list(chain(*self.item_list))
-        if not len(chain_list) and not None in self.results and len(self.results):
+    def dispatch(self):
+        while (order := self.updates.get()) is not None:
+            while not self.updates.empty():
+                if (latest := self.updates.get()) is None:
+                    return
+                order = latest
+            with self.lock:
+                self.update_items(order)
+
+    def update_items(self, order: list[tuple[int, int]]):
+        if not order and None not in self.results and len(self.results):
             notification("No results found")
             self.close()
             return
-        self.add_items(self.window_id, chain_list)
-        self.setFocusId(self.window_id)
-        if selected_position is None:
-            self.select_item(self.window_id, 0)
-        elif selected_item:
-            a_idx = selected_item.getProperty("addon_idx")
-            s_idx = selected_item.getProperty("stream_idx")
-            self.select_item(
+
+        selected_position = self.get_position(self.window_id)
+        selected = (
+            self.shown[selected_position]
+            if selected_position is not None
+            and 0 <= selected_position < len(self.shown)
+            else None
+        )
+
+        properties = [self.get_properties(a, s) for a, s in order]
+        for idx in range(min(len(self.shown), len(order))):
+            if self.shown_properties[idx] != properties[idx]:
+                list_item = self.get_list_item_at(self.window_id, idx)
+                if list_item:
+                    list_item.setProperties(properties[idx])
+        for idx in range(len(self.shown) - 1, len(order) - 1, -1):
+            self.remove_item(self.window_id, idx)
+        if len(order) > len(self.shown):
+            self.add_items(
                 self.window_id,
-                next(
-                    (
-                        idx
-                        for idx, s in enumerate(chain_list)
-                        if s.getProperty("addon_idx") == a_idx
-                        and s.getProperty("stream_idx") == s_idx
-                    ),
-                    0,
-                ),
+                [self.make_item(p) for p in properties[len(self.shown) :]],
             )
-        else:
-            self.select_item(self.window_id, 0)
+        self.shown, self.shown_properties = order, properties
+
+        if selected is not None and selected not in order:
+            selected = self.ranked.resolve(self.results[selected[0]][selected[1]])
+        position = order.index(selected) if selected in order else 0
+        if position != selected_position:
+            self.select_item(self.window_id, position)
+
+        if self.prober and probe_enabled():
+            self.prober.submit(
+                [self.results[a][s] for a, s in order[: probe_count()]],
+                self.on_probe,
+            )
+
         remaining_sources = sum(s is None for s in self.results)
         self.setProperty(
             "remaining_sources",
@@ -95,44 +117,65 @@ class SourcesResults(BaseDialog[StremioStream]):
             ),
         )
 
+    def on_probe(self, stream: StremioStream, result: ProbeResult):
+        if not result.reachable:
+            self.ranked.demote(stream)
+        self.updates.put(self.ranked.order())
+
     def run(self):
         super().run()
         hide_busy_dialog()
         return self.choice
 
     def close(self) -> None:
-        self.result_listeners.remove(self.update_items)
+        if self.queue_update in self.result_listeners:
+            self.result_listeners.remove(self.queue_update)
+        self.updates.put(None)
         super().close()
 
     def onAction(self, action):
-        selected_item = self.get_list_item(self.window_id)
+        with self.lock:
+            if action in self.selection_actions:
+                selected_position = self.get_position(self.window_id)
+                if selected_position is None or not (
+                    0 <= selected_position < len(self.shown)
+                ):
+                    return
+                addon_idx, stream_idx = self.shown[selected_position]
+                self.choice = self.results[addon_idx][stream_idx]
+                self.close()
+            elif action in self.context_actions:
+                self.refresh = True
+                self.close()
+            elif action in self.closing_actions:
+                self.close()
 
-        if action in self.selection_actions:
-            addon_idx = int(selected_item.getProperty("addon_idx"))
-            stream_idx = int(selected_item.getProperty("stream_idx"))
-            self.choice = self.results[addon_idx][stream_idx]
-            self.close()
-        elif action in self.closing_actions:
-            self.close()
+    def get_properties(self, addon_idx, stream_idx) -> dict[str, str]:
+        item = self.results[addon_idx][stream_idx]
+        if (properties := self.properties.get((addon_idx, stream_idx))) is None:
+            properties = {
+                "name": item.name.replace("\n", "[CR]"),
+                "description": item.description.replace("\n", "[CR]"),
+                "hash": item.infoHash or "",
+                "url": item.url or "",
+                "quality": self.ranked.features[(addon_idx, stream_idx)].label,
+                "addon_idx": str(addon_idx),
+                "stream_idx": str(stream_idx),
+                "cached": "true" if item.cached else "",
+            }
+            self.properties[(addon_idx, stream_idx)] = properties
+        probe = self.prober.get(item) if self.prober else None
+        return {
+            **properties,
+            "also_from": ", ".join(item.also_from),
+            "health": probe.label if probe else "",
+        }
 
-    def make_items(self, addon_idx):
-        items = []
-        for count, item in enumerate(self.results[addon_idx]):
-            list_item = NASListItem()
-            set_properties = list_item.setProperties
-
-            set_properties(
-                {
-                    "name": item.name.replace("\n", "[CR]"),
-                    "description": item.description.replace("\n", "[CR]"),
-                    "hash": item.infoHash,
-                    "url": item.url,
-                    "addon_idx": addon_idx,
-                    "stream_idx": count,
-                }
-            )
-            items.append(list_item)
-        return items
+    @staticmethod
+    def make_item(properties: dict[str, str]) -> ListItem:
+        list_item = NASListItem()
+        list_item.setProperties(properties)
+        return list_item
 
     def set_properties(self):
         self.setProperty("fanart", self.meta.background or nas_addon.fanart)
@@ -0,0 +1,51 @@
+"""Benchmark LibraryRow against full StremioMeta objects for the library view.
+
+Run from the repository root with Kodistubs installed:
+    python scripts/bench_library_rows.py
+"""
+
+import random
+
+from common import timed, use_fake_api, use_temp_profile
+
+LIBRARY_SIZE = 5000
+
+if __name__ == "__main__":
+    use_temp_profile()
+    rnd = random.Random(48)
+
+    from classes.StremioLibrary import StremioLibrary
+
+    library = {}
+    for i in range(LIBRARY_SIZE):
+        item = StremioLibrary(
+            _id=f"tt{i}",
+            name=f"Title {i}",
+            type=rnd.choice(["movie", "series"]),
+            poster=f"https://images.example/{i}.jpg",
+            removed=False,
+            temp=False,
+            state={"timesWatched": rnd.randint(0, 2), "timeOffset": 0},
+        )
+        library[item.id] = item
+    use_fake_api(
+        get_data_store=lambda: library,
+        get_data_by_meta=lambda meta: library[meta.id],
+    )
+
+    from classes.LibraryRow import LibraryRow
+    from classes.StremioMeta import StremioMeta
+
+    items = list(library.values())
+
+    def build_metas():
+        for item in items:
+            StremioMeta(**{"id": item.id, **item.as_dict()}).build_list_item()
+
+    def build_rows():
+        for item in items:
+            LibraryRow(item).build_list_item()
+
+    print(f"{LIBRARY_SIZE} library items")
+    timed("StremioMeta per item", build_metas)
+    timed("LibraryRow per item", build_rows)
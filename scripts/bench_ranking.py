@@ -0,0 +1,73 @@
+"""Benchmark incremental stream ranking with thousands of streams.
+
+Run from the repository root with Kodistubs installed:
+    python scripts/bench_ranking.py
+"""
+
+import random
+
+from common import timed
+
+from classes.StremioStream import StremioStream
+from modules.ranking import RankedStreams, RankingWeights, parse_stream
+
+ADDONS = 12
+STREAMS_PER_ADDON = 400
+QUALITIES = ["2160p", "4K", "1080p", "720p", "480p", ""]
+CODECS = ["x265", "HEVC", "x264", "AV1", ""]
+EXTRAS = ["HDR10", "DV", ""]
+
+
+def random_stream(rnd: random.Random, idx: int) -> StremioStream:
+    title = " ".join(
+        [
+            f"Movie.{idx}",
+            rnd.choice(QUALITIES),
+            rnd.choice(CODECS),
+            rnd.choice(EXTRAS),
+            f"👤 {rnd.randint(0, 3000)}",
+            f"{rnd.uniform(0.5, 60):.2f} GB",
+        ]
+    )
+    return StremioStream(
+        infoHash=f"{rnd.randrange(2 ** 40):040x}",
+        fileIdx=rnd.randint(0, 3),
+        name=f"Addon {idx % ADDONS}",
+        description=title,
+    )
+
+
+def build_batches() -> list[list[StremioStream]]:
+    rnd = random.Random(36)
+    streams = [random_stream(rnd, i) for i in range(ADDONS * STREAMS_PER_ADDON)]
+    return [
+        streams[i : i + STREAMS_PER_ADDON]
+        for i in range(0, len(streams), STREAMS_PER_ADDON)
+    ]
+
+
+def insert_all(batches: list[list[StremioStream]]) -> RankedStreams:
+    ranked = RankedStreams(weights=RankingWeights())
+    for addon_idx, batch in enumerate(batches):
+        ranked.insert(batch, addon_idx)
+    return ranked
+
+
+def sort_all(batches: list[list[StremioStream]]) -> list[tuple[int, int]]:
+    weights = RankingWeights()
+    keys = [
+        (-weights.score(parse_stream(stream)), addon_idx, stream_idx)
+        for addon_idx, batch in enumerate(batches)
+        for stream_idx, stream in enumerate(batch)
+    ]
+    return [(k[1], k[2]) for k in sorted(keys)]
+
+
+if __name__ == "__main__":
+    batches = build_batches()
+    print(f"{ADDONS} addons x {STREAMS_PER_ADDON} streams")
+    ranked = timed("incremental insert of every batch", lambda: insert_all(batches))
+    expected = timed("parse and sort once at the end", lambda: sort_all(batches))
+    matches = ranked.order() == expected
+    print(f"order matches a full sort: {matches}")
+    raise SystemExit(0 if matches else 1)
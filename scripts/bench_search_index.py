@@ -0,0 +1,104 @@
+"""Benchmark the local search index on a 20k-title corpus.
+
+Run from the repository root with Kodistubs installed:
+    python scripts/bench_search_index.py
+"""
+
+import random
+
+from common import timed, use_fake_api, use_temp_profile
+
+LIBRARY_SIZE = 5000
+META_SIZE = 15000
+QUERIES = 1000
+
+
+def random_words(rnd: random.Random, count: int) -> list[str]:
+    return [
+        "".join(
+            rnd.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rnd.randint(3, 9))
+        )
+        for _ in range(count)
+    ]
+
+
+if __name__ == "__main__":
+    use_temp_profile()
+    rnd = random.Random(45)
+    words = random_words(rnd, 3000)
+
+    from classes.StremioLibrary import StremioLibrary
+
+    library = {
+        f"lib{i}": StremioLibrary(
+            _id=f"lib{i}",
+            name=" ".join(rnd.sample(words, 3)),
+            type="movie",
+            removed=False,
+            temp=False,
+        )
+        for i in range(LIBRARY_SIZE)
+    }
+    use_fake_api(get_data_store=lambda: library, get_data_by_meta=lambda meta: None)
+
+    from classes.StremioMeta import StremioMeta
+    from modules import search_index
+
+    search_index.SEARCH_INDEX_MAX_METAS = META_SIZE
+    metas = [
+        StremioMeta(
+            id=f"tt{i}",
+            type="series",
+            name=" ".join(rnd.sample(words, 3)),
+            genres=rnd.sample(words, 2),
+            cast=[" ".join(rnd.sample(words, 2)) for _ in range(4)],
+            director=[rnd.choice(words)],
+        )
+        for i in range(META_SIZE)
+    ]
+
+    index = search_index.SearchIndex()
+    timed(f"add {META_SIZE} metas", lambda: index.add_metas(metas))
+    index.write_timer.cancel()
+    timed("persist", index.flush)
+
+    index = search_index.SearchIndex()
+    timed(f"cold load of {LIBRARY_SIZE + META_SIZE} documents", index.ensure_loaded)
+    print(f"{len(index.docs)} documents, {len(index.postings)} tokens")
+
+    names = [item.name for item in library.values()] + [m.name for m in metas]
+    queries = [
+        " ".join(rnd.choice(names).split()[:2])[: rnd.randint(2, 12)]
+        for _ in range(QUERIES)
+    ]
+    timed(
+        f"indexed search, average of {QUERIES} queries",
+        lambda: [index.search(q) for q in queries],
+        per=QUERIES,
+    )
+    timed(
+        "single library update",
+        lambda: index.update_library([library["lib7"]]),
+    )
+
+    docs = list(index.docs.values())
+
+    def linear_scan(query: str):
+        tokens = search_index.tokenize(query)
+        return [
+            d
+            for d in docs
+            if all(
+                any(
+                    word.startswith(token)
+                    for word in search_index.tokenize(f"{d['name']} {d['text']}")
+                )
+                for token in tokens
+            )
+        ]
+
+    timed(
+        "linear scan, average of 20 queries",
+        lambda: [linear_scan(q) for q in queries[:20]],
+        per=20,
+    )
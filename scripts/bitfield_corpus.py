@@ -0,0 +1,93 @@
+"""Check WatchedBitfield re-anchoring against a bit-by-bit reference.
+
+Run from the repository root with Kodistubs installed:
+    python scripts/bitfield_corpus.py
+"""
+
+import base64
+import random
+import zlib
+
+from common import timed
+
+from classes.StremioLibrary import BitField8, WatchedBitfield
+
+CORPUS_SIZE = 20000
+BENCHMARK_BITS = 5000
+
+
+def reference_resize(serialized: str, video_ids: list[str]) -> BitField8:
+    components = serialized.split(":")
+    serialized_buf = components.pop()
+    anchor_length = int(components.pop())
+    anchor_video_id = ":".join(components)
+    resized = BitField8(len(video_ids))
+    if anchor_video_id not in video_ids:
+        return resized
+
+    offset = (anchor_length - 1) - video_ids.index(anchor_video_id)
+    prev = BitField8.from_packed(
+        base64.b64decode(serialized_buf.encode("ascii")),
+        anchor_length if offset else len(video_ids),
+    )
+    if not offset:
+        return prev
+    for i in range(len(video_ids)):
+        if 0 <= i + offset < prev.length:
+            resized.set(i, prev.get(i + offset))
+    return resized
+
+
+def random_case(rnd: random.Random) -> tuple[str, list[str]]:
+    n_bytes = rnd.randint(1, 16)
+    values = bytes(rnd.getrandbits(8) for _ in range(n_bytes))
+    video_ids = [f"tt1:{rnd.randint(1, 9)}:{i}" for i in range(rnd.randint(1, 150))]
+    anchor = rnd.choice(video_ids) if rnd.random() < 0.9 else "tt1:missing"
+    anchor_length = rnd.randint(1, n_bytes * 8 + 12)
+    packed = base64.b64encode(zlib.compress(values)).decode("ascii")
+    return f"{anchor}:{anchor_length}:{packed}", video_ids
+
+
+def check_corpus():
+    rnd = random.Random(27)
+    failures = 0
+    for _ in range(CORPUS_SIZE):
+        serialized, video_ids = random_case(rnd)
+        expected = reference_resize(serialized, video_ids)
+        actual = WatchedBitfield.construct_and_resize(serialized, video_ids)
+        same = (
+            actual.bitfield.values == expected.values
+            and actual.bitfield.length == expected.length
+            and actual.serialize() == WatchedBitfield(expected, video_ids).serialize()
+        )
+        if not same:
+            failures += 1
+            if failures <= 5:
+                print(f"mismatch: {serialized} ({len(video_ids)} videos)")
+    print(f"{CORPUS_SIZE} cases, {failures} mismatches")
+    return failures
+
+
+def benchmark():
+    rnd = random.Random(5000)
+    video_ids = [f"tt2:1:{i}" for i in range(BENCHMARK_BITS)]
+    values = bytes(rnd.getrandbits(8) for _ in range(BENCHMARK_BITS // 8))
+    packed = base64.b64encode(zlib.compress(values)).decode("ascii")
+    serialized = f"{video_ids[-38]}:{BENCHMARK_BITS}:{packed}"
+
+    timed(
+        "reference re-anchor",
+        lambda: reference_resize(serialized, video_ids),
+        repeat=50,
+    )
+    timed(
+        "construct_and_resize",
+        lambda: WatchedBitfield.construct_and_resize(serialized, video_ids),
+        repeat=50,
+    )
+
+
+if __name__ == "__main__":
+    failed = check_corpus()
+    benchmark()
+    raise SystemExit(1 if failed else 0)
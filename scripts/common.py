@@ -0,0 +1,33 @@
+import os
+import sys
+import tempfile
+import time
+import types
+
+LIB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "lib"
+)
+sys.path.insert(0, LIB_PATH)
+
+
+def use_temp_profile() -> str:
+    import addon
+
+    path = tempfile.mkdtemp(prefix="nas-profile-")
+    type(addon.nas_addon).profile = property(lambda self: path)
+    return path
+
+
+def use_fake_api(**attrs) -> types.SimpleNamespace:
+    api = types.SimpleNamespace(**attrs)
+    sys.modules["apis.StremioAPI"] = types.SimpleNamespace(stremio_api=api)
+    return api
+
+
+def timed(label: str, func, repeat: int = 1, per: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat / per
+    print(f"{label}: {elapsed * 1000:.2f} ms")
+    return result